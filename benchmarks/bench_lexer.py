@@ -0,0 +1,62 @@
+"""Compare token counts and highlight time across lexer options.
+
+Usage::
+
+    python benchmarks/bench_lexer.py [copies]
+"""
+
+import glob
+import os
+import sys
+import time
+
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+
+from vue.lexer import VueLexer
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+EXAMPLES = sorted(glob.glob(os.path.join(HERE, "..", "examples", "*.vue")))
+
+OPTIONS = [
+    ("default", {}),
+    ("coalesce", {"coalesce": True}),
+    ("coalesce+absorb", {"coalesce": True, "absorb_whitespace": True}),
+]
+
+
+def load_corpus(copies):
+    texts = []
+    for path in EXAMPLES:
+        with open(path, "r") as fh:
+            texts.append(fh.read())
+    return "".join(texts) * copies
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv):
+    copies = int(argv[1]) if len(argv) > 1 else 100
+    text = load_corpus(copies)
+    formatter = HtmlFormatter()
+    print("%d bytes" % len(text))
+    for name, options in OPTIONS:
+        lexer = VueLexer(**options)
+        count = sum(1 for _ in lexer.get_tokens(text))
+        lexing = best_of(lambda: list(lexer.get_tokens(text)))
+        total = best_of(lambda: highlight(text, lexer, formatter))
+        print(
+            "%-20s %8d tokens  lex %7.3f s  highlight %7.3f s"
+            % (name, count, lexing, total)
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,69 @@
+"""Time each lexing strategy across input sizes, to calibrate thresholds.
+
+Usage::
+
+    python benchmarks/bench_strategy.py [max size]
+
+Each input is one component with a ``<template>``, a ``<script>`` and a
+``<style>`` block of about a third of the size each. The fastest strategy
+per size shows whether ``VueLexer.BLOCKS_THRESHOLD`` should be set.
+"""
+
+import sys
+import time
+
+from vue.lexer import STRATEGIES, VueLexer
+
+TEMPLATE = (
+    '  <my-item v-for="item in items" :key="item.id" @click="select(item)">\n'
+    "    {{ item.name }}\n"
+    "  </my-item>\n"
+)
+SCRIPT = "  method(a, b) { return this.items.filter(x => x.id === a).length },\n"
+STYLE = "  .item { font-size: 2em; text-align: center; }\n"
+
+
+def make_component(size):
+    def block(tag, body, head="", tail=""):
+        count = max(1, size // 3 // len(body))
+        return "<%s>\n%s%s%s</%s>\n\n" % (tag, head, body * count, tail, tag)
+
+    return "".join(
+        [
+            block("template", TEMPLATE, "<div>\n", "</div>\n"),
+            block("script", SCRIPT, "export default {\n", "}\n"),
+            block("style", STYLE),
+        ]
+    )
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv):
+    limit = int(argv[1]) if len(argv) > 1 else 1000000
+    strategies = [name for name in STRATEGIES if name != "auto"]
+    print("%10s  %s" % ("size", "  ".join("%10s" % name for name in strategies)))
+    size = 1000
+    while size <= limit:
+        text = make_component(size)
+        timings = []
+        for name in strategies:
+            lexer = VueLexer(strategy=name)
+            timings.append(best_of(lambda: list(lexer.get_tokens_unprocessed(text))))
+        fastest = strategies[timings.index(min(timings))]
+        print(
+            "%10d  %s  %s"
+            % (len(text), "  ".join("%8.4f s" % t for t in timings), fastest)
+        )
+        size *= 10
+
+
+if __name__ == "__main__":
+    main(sys.argv)
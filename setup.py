@@ -1,7 +1,7 @@
 import io
 import os
 
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
 
 
 VERSION = '0.0.4'
@@ -29,6 +29,10 @@ setup(
     test_suite='tests',
     license='MIT License',
     packages=find_packages(exclude=["docs", "tests", "tests.*"]),
+    # Built by `make table`, see `vue.table`
+    package_data={"vue": ["_table.json"]},
+    # Optional: the lexer falls back to pure Python when this is not built
+    ext_modules=[Extension("vue._speedups", ["vue/_speedups.c"], optional=True)],
     entry_points="""
         [pygments.lexers]
         vue=vue:VueLexer
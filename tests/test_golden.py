@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from vue import golden
+
+CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
+EXAMPLES_DIR = os.path.join(CURRENT_DIR, "..", "examples")
+
+
+class GoldenTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmpdir, "corpus")
+        shutil.copytree(EXAMPLES_DIR, os.path.join(self.corpus, "examples"))
+        self.store = os.path.join(self.tmpdir, "golden.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = golden.main([self.corpus, "--store", self.store] + list(args))
+        return status, out.getvalue()
+
+    def test_fingerprint(self):
+        digest, histogram = golden.fingerprint([])
+        self.assertEqual(histogram, {})
+        tokens = list(golden.VueLexer().get_tokens("<p>{{ a }}</p>\n"))
+        digest, histogram = golden.fingerprint(tokens)
+        self.assertEqual(len(digest), 32)
+        self.assertEqual(histogram["Token.Name.Tag"], 2)
+        self.assertEqual(sum(histogram.values()), len(tokens))
+        self.assertNotEqual(golden.fingerprint(tokens[:-1])[0], digest)
+
+    def test_find_files(self):
+        self.assertEqual(
+            golden.find_files(self.corpus),
+            [os.path.join("examples", "example%d.vue" % i) for i in (1, 2, 3)],
+        )
+
+    def test_unchanged(self):
+        self.assertEqual(self.run_main("--update")[0], 0)
+        status, output = self.run_main("--threshold", "0")
+        self.assertEqual(status, 0)
+        self.assertIn("3 files, 0 problems", output)
+
+    def test_changed_added_removed(self):
+        self.run_main("--update")
+        os.remove(os.path.join(self.corpus, "examples", "example2.vue"))
+        with open(os.path.join(self.corpus, "examples", "example1.vue"), "a") as fh:
+            fh.write("<div>{{ extra }}</div>\n")
+        with open(os.path.join(self.corpus, "new.vue"), "w") as fh:
+            fh.write("<template></template>\n")
+        status, output = self.run_main("--threshold", "0", "-j", "2")
+        self.assertEqual(status, 1)
+        self.assertIn("example1.vue: output changed (", output)
+        self.assertIn("Token.Name.Tag 8 -> 10", output)
+        self.assertIn("example2.vue: removed", output)
+        self.assertIn("new.vue: added", output)
+
+    def test_slower(self):
+        old = golden.lex_corpus(self.corpus)
+        new = {
+            path: dict(info, seconds=info["seconds"] * 3) for path, info in old.items()
+        }
+        problems = golden.compare(old, new, threshold=0.5, min_delta=0)
+        self.assertEqual([kind for _, kind, _ in problems], ["slower"] * 3)
+        self.assertEqual(golden.compare(old, new, threshold=0, min_delta=0), [])
+        self.assertEqual(golden.compare(old, new, threshold=0.5, min_delta=60), [])
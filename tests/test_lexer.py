@@ -1,5 +1,8 @@
+import itertools
 import os
 import re
+import subprocess
+import sys
 from unittest import TestCase
 
 from pygments import lexers
@@ -337,3 +340,313 @@ class VueLexerTestCase(TestCase):
                 (Token.Punctuation, ">"),
             ],
         )
+
+    def test_coalesce(self):
+        tokens = list(VueLexer(coalesce=True).get_tokens(text_one))
+        self.assertEqual("".join(value for _, value in tokens), text_one)
+        self.assertLess(len(tokens), len(expected_tokens_one))
+        self.assertIn((Token.Punctuation, "}}"), tokens)
+        self.assertIn((Token.Punctuation, "</"), tokens)
+        for (ttype, _), (next_ttype, _) in zip(tokens, tokens[1:]):
+            self.assertIsNot(ttype, next_ttype)
+
+    def test_coalesce_absorb_whitespace(self):
+        lexer = VueLexer(coalesce=True, absorb_whitespace=True)
+        tokens = list(lexer.get_tokens(text_one))
+        self.assertEqual("".join(value for _, value in tokens), text_one)
+        coalesced = list(VueLexer(coalesce=True).get_tokens(text_one))
+        self.assertLess(len(tokens), len(coalesced))
+        self.assertIn((Token.Name.Other, "sample comment"), tokens)
+
+    def test_max_errors_resyncs_at_next_line(self):
+        text = (
+            '<template>\n  <div class="a" """""" !!!! more\n  <p>x</p>\n</template>\n'
+        )
+        lexer = VueLexer(max_errors=3)
+        tokens = list(lexer.get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertEqual(lexer.recoveries, 1)
+        errors = [value for ttype, value in tokens if ttype is Token.Error]
+        self.assertEqual(errors, ['"', '"', '"', '""" !!!! more'])
+        self.assertIn((Token.Name.Tag, "p"), tokens)
+
+    def test_max_errors_resyncs_at_block_tag(self):
+        text = '<template>\n  <div class="a"\n</template>\n\n<script>\nconst x = 1;\n</script>\n'
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertIn((Token.Error, "<"), tokens)
+
+        lexer = VueLexer(max_errors=3)
+        tokens = list(lexer.get_tokens(text))
+        self.assertEqual(lexer.recoveries, 1)
+        self.assertNotIn(Token.Error, [ttype for ttype, _ in tokens])
+        self.assertIn((Token.Name.Tag, "template"), tokens[10:15])
+
+    def test_max_errors_is_bounded_per_line(self):
+        text = '<div """"""""""""""""\n' * 100
+        lexer = VueLexer(max_errors=3)
+        tokens = list(lexer.get_tokens(text))
+        errors = [ttype for ttype, _ in tokens if ttype is Token.Error]
+        self.assertEqual(len(errors), 4 * 100)
+        self.assertEqual(lexer.recoveries, 100)
+
+    def test_max_errors_keeps_valid_input(self):
+        for text in (text_one, text_two, text_three):
+            lexer = VueLexer(max_errors=1)
+            tokens = list(lexer.get_tokens(text))
+            self.assertEqual(tokens, list(VueLexer().get_tokens(text)))
+            self.assertEqual(lexer.recoveries, 0)
+
+    def test_template_lang_pug(self):
+        text = '<template lang="pug">\ndiv.app\n  p(class="x") Hello\n</template>\n\n<script>\nexport default {}\n</script>\n'
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertIn((Token.Name.Class, ".app"), tokens)
+        self.assertIn((Token.Name.Attribute, "class="), tokens)
+        self.assertIn((Token.Name.Tag, "script"), tokens)
+        keywords = [value for ttype, value in tokens if ttype in Token.Keyword]
+        self.assertEqual(keywords, ["export", "default"])
+
+    def test_template_lang_html(self):
+        text = "<template lang='html'>\n  <p>{{ a }}</p>\n</template>\n"
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertIn((Token.Text, "{{ a }}"), tokens)
+        self.assertEqual(
+            tokens[-4:-1],
+            [
+                (Token.Punctuation, "/"),
+                (Token.Name.Tag, "template"),
+                (Token.Punctuation, ">"),
+            ],
+        )
+
+    def test_template_lang_nested_template(self):
+        text = '<template lang="html">\n  <div>\n    <template v-if="a">\n      <p>x</p>\n    </template>\n    <span>y</span>\n  </div>\n</template>\n'
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertIn((Token.Name.Tag, "span"), tokens)
+        self.assertNotIn(Token.Name.Other, [ttype for ttype, _ in tokens])
+        closing = list(VueLexer().get_tokens("<template>\n</template>"))
+        self.assertEqual(tokens[-5:-1], closing[-5:-1])
+
+        # an indented closing tag, the next block is not part of it
+        text = '<template lang="html">\n  <p>x</p>\n  </template>\n\n<template>\n  <p>{{ a }}</p>\n</template>\n'
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertIn((Token.Name.Other, "a"), tokens)
+
+    def test_template_lang_html_script(self):
+        # the HTML lexer lexes the script with the rules of this lexer
+        text = (
+            '<template lang="html">\n  <script>a = <my-comp/></script>\n</template>\n'
+        )
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertIn((Token.Name.Tag, "my-comp"), tokens)
+
+    def test_template_lang_other(self):
+        text = '<template lang="vue">\n  <p>{{ a }}</p>\n</template>\n'
+        plain = text.replace(' lang="vue"', "")
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual(tokens[7:], list(VueLexer().get_tokens(plain))[3:])
+
+    def test_template_lang_whole_names(self):
+        # `template` and `lang` are not matched inside longer names
+        for text in [
+            '<template-row lang="html">\n  <p>{{ a }}</p>\n</template-row>\n',
+            '<template data-lang="pug">\n  <p>{{ a }}</p>\n</template>\n',
+            '<template :lang="html">\n  <p>{{ a }}</p>\n</template>\n',
+            '<template xml:lang="html">\n  <p>{{ a }}</p>\n</template>\n',
+        ]:
+            plain = text.replace("lang=", "lung=")
+            tokens = list(VueLexer().get_tokens(text))
+            self.assertEqual(
+                [ttype for ttype, _ in tokens],
+                [ttype for ttype, _ in VueLexer().get_tokens(plain)],
+                text,
+            )
+
+    def test_template_lang_is_loaded_lazily(self):
+        code = "import sys, vue; print('pygments.lexers.html' in sys.modules)"
+        output = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(output.strip(), b"False")
+
+    def test_split_blocks(self):
+        text = text_one + "\n" + text_two
+        spans = lexer_mod.split_blocks(text)
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(text))
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(text[start], "<")
+        self.assertEqual(len(spans), 5)
+        self.assertEqual(lexer_mod.split_blocks(""), [(0, 0)])
+
+    def test_strategy_auto(self):
+        lexer = VueLexer(blocks_threshold=1000)
+        list(lexer.get_tokens_unprocessed(text_one))
+        self.assertEqual(lexer.decision["strategy"], "regex")
+        self.assertNotIn("spans", lexer.decision)
+        self.assertNotIn("seconds", lexer.decision)
+
+        text = (text_one + "\n" + text_two) * 3
+        list(lexer.get_tokens_unprocessed(text))
+        decision = lexer.decision
+        self.assertEqual(decision["strategy"], "blocks")
+        self.assertEqual(decision["length"], len(text))
+        self.assertEqual(len(decision["blocks"]), len(decision["spans"]))
+        self.assertGreaterEqual(decision["seconds"], sum(decision["blocks"]))
+        largest = max(end - start for start, end in decision["spans"])
+        self.assertEqual(decision["largest"], largest)
+        self.assertNotIn("fallback", decision)
+
+        # not split unless asked to
+        lexer = VueLexer()
+        list(lexer.get_tokens_unprocessed((text_one + "\n" + text_two) * 150))
+        self.assertEqual(lexer.decision["strategy"], "regex")
+
+        # a single block
+        lexer = VueLexer(blocks_threshold=500)
+        list(lexer.get_tokens_unprocessed(text_three))
+        self.assertEqual(lexer.decision["strategy"], "regex")
+        self.assertEqual(lexer.decision["largest"], len(text_three))
+
+        # most of the text in one block
+        text = text_one + "<template>\n%s</template>\n" % ("  <p></p>\n" * 100)
+        list(lexer.get_tokens_unprocessed(text))
+        self.assertEqual(len(lexer.decision["spans"]), 4)
+        self.assertEqual(lexer.decision["strategy"], "regex")
+
+    def test_strategy_blocks_is_exact(self):
+        text = (text_one + "\n" + text_two + "\n" + text_three) * 2
+        for options in ({}, {"max_errors": 2}, {"coalesce": True}):
+            expected = list(VueLexer(strategy="regex", **options).get_tokens(text))
+            tokens = list(VueLexer(strategy="blocks", **options).get_tokens(text))
+            self.assertEqual(tokens, expected)
+
+    def test_strategy_blocks_fallback(self):
+        # the string opened by the apostrophe runs into the next block
+        text = "<template>\n  <p>Don't</p>\n</template>\n\n<script>\n'x'\n</script>\n"
+        lexer = VueLexer(strategy="blocks")
+        tokens = list(lexer.get_tokens(text))
+        self.assertEqual(tokens, list(VueLexer(strategy="regex").get_tokens(text)))
+        self.assertEqual(lexer.decision["fallback"], 0)
+
+    def test_strategy_blocks_interleaved(self):
+        # as when one lexer is shared by threads
+        texts = [(text_one + "\n" + text_two) * 2, (text_three + "\n" + text_one) * 2]
+        expected = [list(VueLexer().get_tokens_unprocessed(text)) for text in texts]
+        lexer = VueLexer(strategy="blocks")
+        runs, decisions = [], []
+        for text in texts:
+            runs.append(lexer.get_tokens_unprocessed(text))
+            decisions.append(lexer.decision)
+        tokens = [[], []]
+        for pair in itertools.zip_longest(*runs):
+            for items, item in zip(tokens, pair):
+                if item is not None:
+                    items.append(item)
+        self.assertEqual(tokens, expected)
+        for decision in decisions:
+            self.assertTrue(decision["blocks"])
+            self.assertGreaterEqual(decision["seconds"], sum(decision["blocks"]))
+
+    def test_strategy_invalid(self):
+        from pygments.util import OptionError
+
+        self.assertRaises(OptionError, VueLexer, strategy="fast")
+
+    def test_component_tags(self):
+        text = "<template>\n  <my-comp>\n    <el-table.column></el-table.column>\n    <svg:rect></svg:rect >\n  </my-comp>\n</template>\n"
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertNotIn(Token.Error, [ttype for ttype, _ in tokens])
+        tags = [value for ttype, value in tokens if ttype is Token.Name.Tag]
+        names = "template my-comp el-table.column el-table.column svg:rect svg:rect"
+        self.assertEqual(tags, names.split() + ["my-comp", "template"])
+
+    def test_self_closing_tags(self):
+        text = (
+            '<template>\n  <MyComp/>\n  <my-comp />\n  <my-comp a="1"/>\n</template>\n'
+        )
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        self.assertEqual(
+            tokens[4:8],
+            [
+                (Token.Punctuation, "<"),
+                (Token.Name.Tag, "MyComp"),
+                (Token.Punctuation, "/"),
+                (Token.Punctuation, ">"),
+            ],
+        )
+        self.assertIn((Token.Name.Attribute, "a"), tokens)
+        self.assertNotIn(Token.Error, [ttype for ttype, _ in tokens])
+
+    def test_closing_tags_are_matched(self):
+        text = (
+            "<template>\n  <div>\n    <span></p></span>\n  </div></div>\n</template>\n"
+        )
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertEqual("".join(value for _, value in tokens), text)
+        errors = [value for ttype, value in tokens if ttype is Token.Error]
+        self.assertEqual(errors, ["p", "div"])
+        self.assertEqual(
+            tokens[-5:-1],
+            [
+                (Token.Punctuation, "<"),
+                (Token.Punctuation, "/"),
+                (Token.Name.Tag, "template"),
+                (Token.Punctuation, ">"),
+            ],
+        )
+
+    def test_closing_tag_closes_inner_tags(self):
+        # like HTML, `</ul>` also closes the `<li>` elements left open
+        text = "<template>\n  <ul>\n    <li>a\n    <li><b>b</ul>\n</template>\n"
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertNotIn(Token.Error, [ttype for ttype, _ in tokens])
+        text = text.replace("</ul>", "</ul></li>")
+        tokens = list(VueLexer().get_tokens(text))
+        errors = [value for ttype, value in tokens if ttype is Token.Error]
+        self.assertEqual(errors, ["li"])
+
+    def test_void_tags(self):
+        text = '<template>\n  <p>a<br>b<BR><img src="x"><input :value="v"></p>\n</template>\n'
+        tokens = list(VueLexer().get_tokens(text))
+        self.assertNotIn(Token.Error, [ttype for ttype, _ in tokens])
+        # void elements have no closing tag
+        tokens = list(VueLexer().get_tokens("<template><br></br></template>\n"))
+        errors = [value for ttype, value in tokens if ttype is Token.Error]
+        self.assertEqual(errors, ["br"])
+
+    def test_open_tags_per_call(self):
+        lexer = VueLexer()
+        list(lexer.get_tokens("<template>\n  <div>\n"))
+        tokens = list(lexer.get_tokens("</div>\n"))
+        self.assertIn((Token.Error, "div"), tokens)
+
+    def test_strategy_blocks_open_tag(self):
+        # a tag left open at the end of a block is closed in the next one
+        text = "<div>\n</template>\n\n<script>\n</div>\n</script>\n"
+        lexer = VueLexer(strategy="blocks")
+        tokens = list(lexer.get_tokens(text))
+        self.assertEqual(tokens, list(VueLexer(strategy="regex").get_tokens(text)))
+        self.assertEqual(lexer.decision["fallback"], 0)
+
+    def test_less_than(self):
+        # not a tag, left to the JavaScript rules
+        for text in ("a < b\n", "a <= b\n", "a << b\n", "a </ b>\n", "a </b c>\n"):
+            tokens = list(VueLexer().get_tokens(text))
+            self.assertEqual(tokens[2][0], Token.Operator, text)
+            self.assertNotIn(Token.Name.Tag, [ttype for ttype, _ in tokens], text)
+
+    def test_tag_names_are_interned(self):
+        text = "<template>\n  <my-comp></my-comp>\n</template>\n"
+        lexer = VueLexer()
+        tokens = lexer.get_tokens(text)
+        tags = [value for ttype, value in tokens if ttype is Token.Name.Tag]
+        self.assertIs(tags[1], tags[2])
+        self.assertIs(tags[1], lexer.tag_names["my-comp"])
+        self.assertIs(lexer.intern_tag("".join(["my-", "comp"])), tags[1])
+        # each lexer has its own table
+        self.assertEqual(VueLexer().tag_names, {})
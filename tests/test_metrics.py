@@ -0,0 +1,109 @@
+import threading
+from unittest import TestCase
+
+from pygments.token import Token
+
+from vue import metrics
+from vue.lexer import VueLexer
+
+TEXT = '<template>\n  <p :title="{ a: 1 }">{{ a }}</p>\n</template>\n'
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        self.collector = metrics.enable()
+        self.collector.reset()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_disabled(self):
+        metrics.disable()
+        self.assertIsNone(metrics.collector)
+        list(VueLexer().get_tokens(TEXT))
+        self.assertEqual(self.collector.texts, 0)
+
+    def test_enable_is_shared(self):
+        self.assertIs(metrics.enable(), self.collector)
+
+    def test_counts(self):
+        lexer = VueLexer()
+        tokens = list(lexer.get_tokens_unprocessed(TEXT))
+        list(lexer.get_tokens_unprocessed("é"))
+        data = self.collector.as_dict()
+        self.assertEqual(data["texts"], 2)
+        self.assertEqual(data["bytes"], len(TEXT) + 2)
+        self.assertEqual(sum(data["tokens"].values()), len(tokens) + 1)
+        self.assertEqual(data["tokens"]["Token.Name.Tag"], 4)
+        self.assertEqual(data["errors"], 0)
+        self.assertGreater(data["seconds"], 0)
+
+    def test_max_depth(self):
+        list(VueLexer().get_tokens_unprocessed("<p :a={ b }></p>\n"))
+        list(VueLexer().get_tokens_unprocessed("<p></p>\n"))
+        # root, tag, attr, expression
+        self.assertEqual(self.collector.max_depth, 4)
+
+    def test_counts_coalesced_tokens(self):
+        tokens = list(VueLexer(coalesce=True).get_tokens_unprocessed(TEXT))
+        self.assertEqual(sum(self.collector.tokens.values()), len(tokens))
+
+    def test_errors_and_recoveries(self):
+        lexer = VueLexer(max_errors=2)
+        list(lexer.get_tokens_unprocessed("<p>\n#### ####\n</p>\n"))
+        self.assertEqual(self.collector.errors, self.collector.tokens[Token.Error])
+        self.assertEqual(self.collector.recoveries, 1)
+
+    def test_shared_lexer(self):
+        # each call counts its own recoveries, not those of the last run:
+        # `coalesce` holds the last token back until the run is over
+        lexer = VueLexer(max_errors=2, coalesce=True)
+        count = len(list(lexer.get_tokens_unprocessed(TEXT)))
+        self.collector.reset()
+        tokens = lexer.get_tokens_unprocessed(TEXT)
+        for _ in range(count):
+            next(tokens)
+        list(lexer.get_tokens_unprocessed("<p>\n#### ####\n</p>\n"))
+        list(tokens)
+        self.assertEqual(self.collector.texts, 2)
+        self.assertEqual(self.collector.recoveries, 1)
+
+    def test_strategy_blocks(self):
+        text = TEXT + "\n<p>\n#### ####\n</p>\n"
+        lexer = VueLexer(max_errors=2, strategy="blocks")
+        list(lexer.get_tokens_unprocessed(text))
+        self.assertEqual(len(lexer.decision["blocks"]), 2)
+        self.assertEqual(self.collector.recoveries, 1)
+        self.assertEqual(self.collector.max_depth, lexer.max_depth)
+
+    def test_counted_once_exhausted(self):
+        tokens = VueLexer().get_tokens_unprocessed(TEXT)
+        next(tokens)
+        self.assertEqual(self.collector.texts, 0)
+        list(tokens)
+        self.assertEqual(self.collector.texts, 1)
+
+    def test_threads(self):
+        def work():
+            for _ in range(10):
+                list(VueLexer().get_tokens_unprocessed(TEXT))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.collector.texts, 40)
+        self.assertEqual(self.collector.bytes, 40 * len(TEXT))
+
+    def test_openmetrics(self):
+        list(VueLexer().get_tokens_unprocessed(TEXT))
+        text = self.collector.to_openmetrics()
+        lines = text.splitlines()
+        self.assertEqual(lines[-1], "# EOF")
+        self.assertIn("# TYPE vue_texts counter", lines)
+        self.assertIn("vue_texts_total 1", lines)
+        self.assertIn("vue_bytes_total %d" % len(TEXT), lines)
+        self.assertIn('vue_tokens_total{type="Token.Name.Tag"} 4', lines)
+        self.assertIn("# TYPE vue_max_depth gauge", lines)
+        self.assertTrue(text.endswith("\n"))
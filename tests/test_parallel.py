@@ -0,0 +1,187 @@
+import os
+from concurrent.futures import Future
+from unittest import TestCase, mock
+
+from pygments.token import Comment, Token
+
+from vue import parallel
+from vue.lexer import VueLexer
+
+CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def read_example(name):
+    with open(os.path.join(CURRENT_DIR, "..", "examples", name), "r") as fh:
+        return fh.read()
+
+
+TEXT = "\n".join(
+    read_example(name) for name in ("example1.vue", "example2.vue", "example3.vue")
+)
+PUG = '<template lang="pug">\ndiv.app\n  p Hello\n</template>\n\n<script>\nexport default {}\n</script>\n'
+# a string from the apostrophe of the second template to the style, past
+# the end of the next block
+APOSTROPHE = (
+    "<template>\n  <p>Don't</p>\n</template>\n\n"
+    "<script>\nexport default {}\n</script>\n\n"
+    "<style>\np::after { content: 'x' }\n</style>\n"
+)
+
+
+class TodoVueLexer(VueLexer):
+    tokens = dict(
+        VueLexer.tokens, root=[(r"TODO", Comment.Special)] + VueLexer.tokens["root"]
+    )
+
+
+class InlinePool(object):
+    """Runs `parallel.lex_block` in this process, the ``fail``-th call raising."""
+
+    fail = None
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, func, *args):
+        self.calls.append(args)
+        future = Future()
+        if len(self.calls) == self.fail:
+            future.set_exception(ValueError("cannot pickle"))
+        else:
+            future.set_result(func(*args))
+        return future
+
+
+class ParallelTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        parallel.shutdown()
+
+    def assertSameTokens(self, text, cls=VueLexer, **options):
+        lexer = cls(strategy="parallel", processes=2, **options)
+        tokens = list(lexer.get_tokens(text))
+        self.assertEqual(
+            tokens, list(cls(strategy="regex", **options).get_tokens(text))
+        )
+        return lexer
+
+    def test_same_as_sequential(self):
+        for options in ({}, {"max_errors": 2}, {"coalesce": True}):
+            lexer = self.assertSameTokens(TEXT * 2, **options)
+            self.assertEqual(lexer.decision["strategy"], "parallel")
+            self.assertNotIn("fallback", lexer.decision)
+            self.assertEqual(len(lexer.decision["blocks"]), 12)
+
+    def test_sublexer_in_worker(self):
+        lexer = self.assertSameTokens(PUG * 2)
+        self.assertNotIn("fallback", lexer.decision)
+
+    def test_fallback(self):
+        text = "<template>\n  <p>Don't</p>\n</template>\n\n<script>\n'x'\n</script>\n"
+        lexer = self.assertSameTokens(text + TEXT)
+        self.assertEqual(lexer.decision["fallback"], 0)
+
+    def test_open_tag(self):
+        # the `<div>` left open in the first block is closed in the second
+        text = "<div>\n</template>\n\n<script>\n</div>\n</script>\n"
+        lexer = self.assertSameTokens(text + TEXT)
+        self.assertEqual(lexer.decision["fallback"], 0)
+
+    def test_token_past_next_block(self):
+        text = read_example("example1.vue") + "\n" + APOSTROPHE + TEXT
+        tokens = list(VueLexer().get_tokens(text))
+        start, end = text.index("'t</p>"), text.index("'x'") + 1
+        string = text[start:end]
+        self.assertIn((Token.Literal.String.Single, string), tokens)
+        lexer = self.assertSameTokens(text)
+        self.assertEqual(lexer.decision["fallback"], text.index(APOSTROPHE))
+
+    def test_subclass(self):
+        text = (TEXT * 2).replace("export default", "TODO\nexport default")
+        lexer = self.assertSameTokens(text, cls=TodoVueLexer)
+        self.assertNotIn("fallback", lexer.decision)
+        self.assertIn((Token.Comment.Special, "TODO"), list(lexer.get_tokens(text)))
+
+    def test_no_pool(self):
+        error = OSError("no sem_open")
+        with mock.patch.object(parallel, "get_pool", side_effect=error):
+            lexer = self.assertSameTokens(TEXT * 2)
+        self.assertEqual(lexer.decision["fallback"], lexer.decision["spans"][1][0])
+
+    def test_worker_error(self):
+        pool = InlinePool()
+        pool.fail = 2
+        with mock.patch.object(parallel, "get_pool", return_value=pool):
+            lexer = self.assertSameTokens(TEXT * 2)
+        self.assertEqual(lexer.decision["fallback"], lexer.decision["spans"][2][0])
+
+    def test_text_is_shared(self):
+        pool = InlinePool()
+        with mock.patch.object(parallel, "get_pool", return_value=pool):
+            lexer = self.assertSameTokens(TEXT * 2)
+        self.assertNotIn("fallback", lexer.decision)
+        self.assertEqual(len(pool.calls), len(lexer.decision["spans"]) - 1)
+        for args in pool.calls:
+            # the name of the shared memory, not the text
+            self.assertFalse(
+                [arg for arg in args if isinstance(arg, str) and len(arg) > 100]
+            )
+
+    def test_recoveries(self):
+        text = '<template>\n  <div """"""""\n</template>\n\n' * 4
+        lexer = self.assertSameTokens(text, max_errors=3)
+        self.assertEqual(lexer.recoveries, 4)
+
+    def test_auto(self):
+        lexer = VueLexer(processes=2, blocks_threshold=100, parallel_threshold=1500)
+        list(lexer.get_tokens_unprocessed(TEXT * 2))
+        self.assertEqual(lexer.decision["strategy"], "parallel")
+        list(lexer.get_tokens_unprocessed(TEXT[:1000]))
+        self.assertEqual(lexer.decision["strategy"], "blocks")
+
+        lexer = VueLexer(processes=1, blocks_threshold=100, parallel_threshold=1500)
+        list(lexer.get_tokens_unprocessed(TEXT * 2))
+        self.assertEqual(lexer.decision["strategy"], "blocks")
+
+    def test_auto_is_opt_in(self):
+        self.assertEqual(VueLexer().parallel_threshold, 0)
+        self.assertEqual(VueLexer(processes=2).parallel_threshold, 200000)
+        parallel.shutdown()
+        lexer = VueLexer()
+        list(lexer.get_tokens_unprocessed(TEXT * 200))
+        self.assertEqual(lexer.decision["strategy"], "regex")
+        self.assertIsNone(parallel._pool)
+
+    def test_lex_block(self):
+        text = "<p>\n</p>\n\n<b>{{ a }}</b>\n"
+        start = text.index("<b>")
+        shared, size = parallel.share_text(text)
+        try:
+            result = parallel.lex_block(
+                shared.name, size, start, len(text), VueLexer, 0
+            )
+        finally:
+            parallel.release(shared)
+        self.assertEqual(result["pos"], len(text))
+        self.assertEqual(result["stack"], ["root"])
+        self.assertEqual(result["tags"], [])
+        self.assertEqual(result["tokens"][0], (start, "Punctuation", "<"))
+        tokens = list(parallel.load_tokens(result["tokens"], {}))
+        self.assertIs(tokens[1][1], Token.Name.Tag)
+        expected = VueLexer()._get_tokens_unprocessed(text, ["root"], start)
+        self.assertEqual(tokens, list(expected))
+
+    def test_tag_names_are_interned(self):
+        lexer = VueLexer()
+        name = lexer.intern_tag("my-comp")
+        # a copy, as unpickled from a worker
+        tokens = [(0, "Name.Tag", "".join(["my-", "comp"]))]
+        loaded = list(parallel.load_tokens(tokens, lexer.tag_names))
+        self.assertIs(loaded[0][2], name)
+
+    def test_pool_is_shared(self):
+        pool = parallel.get_pool(2)
+        self.assertIs(parallel.get_pool(2), pool)
+        self.assertIsNot(parallel.get_pool(1), pool)
+        parallel.shutdown()
+        self.assertIsNone(parallel._pool)
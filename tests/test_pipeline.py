@@ -0,0 +1,125 @@
+import io
+import os
+import time
+import tracemalloc
+from unittest import TestCase
+
+from pygments.filters import KeywordCaseFilter
+from pygments.formatters import HtmlFormatter, NullFormatter
+
+from vue import pipeline
+from vue.lexer import VueLexer
+
+CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
+EXAMPLES_DIR = os.path.join(CURRENT_DIR, "..", "examples")
+
+with open(os.path.join(EXAMPLES_DIR, "example1.vue"), "r") as fh:
+    text_one = fh.read()
+
+with open(os.path.join(EXAMPLES_DIR, "example3.vue"), "r") as fh:
+    text_three = fh.read()
+
+
+class NullWriter(object):
+    def write(self, data):
+        pass
+
+
+# the expression of the first template is never closed
+text_unclosed = text_one.replace("<p>", "<p :a={>", 1)
+
+
+def component_lines(copies, first=text_one):
+    for i in range(copies):
+        for line in io.StringIO(first if i == 0 else text_one):
+            yield line
+
+
+class PipelineTestCase(TestCase):
+
+    maxDiff = None
+
+    def test_iter_blocks(self):
+        blocks = list(pipeline.iter_blocks(io.StringIO(text_one)))
+        self.assertEqual("".join(blocks), text_one)
+        self.assertEqual(len(blocks), 3)
+        self.assertTrue(blocks[0].endswith("</template>\n\n"))
+        self.assertTrue(blocks[1].startswith("<script>"))
+        self.assertTrue(blocks[2].startswith("<style scoped>"))
+
+    def test_lex_matches_lexer(self):
+        texts = []
+        for name in ("example1.vue", "example2.vue", "example3.vue"):
+            with open(os.path.join(EXAMPLES_DIR, name), "r") as fh:
+                texts.append(fh.read())
+        texts += [
+            # the string opened by the apostrophe runs into the next block
+            "<template>\n  <p>Don't</p>\n</template>\n\n<script>\nconst s = 'x'\n</script>\n",
+            # an unindented nested template
+            '<template>\n<div>\n<template v-if="a">\n<p>x</p>\n</template>\n<span>y</span>\n</div>\n</template>\n',
+            text_one + "\n" + text_three,
+            text_unclosed + text_one + text_three,
+            # a tag left open in a block, closed in the next one
+            "<div>\n</template>\n\n<script>\n</div>\n</script>\n",
+        ]
+        for text in texts:
+            expected = [
+                (ttype, value)
+                for _, ttype, value in VueLexer().get_tokens_unprocessed(text)
+            ]
+            self.assertEqual(list(pipeline.lex(io.StringIO(text))), expected)
+
+    def test_lex_coalesce(self):
+        lexer = VueLexer(coalesce=True)
+        expected = [(ttype, value) for ttype, value in lexer.get_tokens(text_one)]
+        self.assertEqual(list(pipeline.lex(io.StringIO(text_one), lexer)), expected)
+
+    def test_lex_is_lazy(self):
+        tokens = pipeline.lex(component_lines(1000000))
+        self.assertEqual(next(tokens)[1], "<")
+
+    def test_filter(self):
+        tokens = pipeline.filter(
+            pipeline.lex(io.StringIO(text_one)),
+            KeywordCaseFilter(case="upper"),
+            "whitespace",
+        )
+        self.assertIn("FUNCTION", "".join(value for _, value in tokens))
+
+    def test_highlight(self):
+        out = io.StringIO()
+        pipeline.highlight(io.StringIO(text_three), HtmlFormatter(), out)
+        self.assertIn('<span class="nt">template</span>', out.getvalue())
+
+    def test_memory_is_bounded(self):
+        def peak(copies):
+            tracemalloc.start()
+            try:
+                pipeline.highlight(
+                    component_lines(copies), NullFormatter(), NullWriter()
+                )
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small, large = peak(10), peak(1000)
+        self.assertLess(large, small * 2)
+
+    def test_unclosed_expression(self):
+        # every block after the first one fails the check
+        def run(copies):
+            tracemalloc.start()
+            try:
+                start = time.perf_counter()
+                for _ in pipeline.lex(component_lines(copies, text_unclosed)):
+                    pass
+                seconds = time.perf_counter() - start
+                return seconds, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        run(10)
+        small, large = run(20), run(160)
+        # each block is lexed once
+        self.assertLess(large[0], small[0] * 24)
+        self.assertLess(large[1], small[1] * 2)
@@ -0,0 +1,116 @@
+import json
+from unittest import TestCase
+
+from pygments.token import Token
+
+from vue.lexer import VueLexer
+from vue.sourcemap import BASE64, SourceMap, decode_vlq
+
+
+def encode_vlq(values):
+    out = []
+    for value in values:
+        value = (-value << 1) | 1 if value < 0 else value << 1
+        while True:
+            digit = value & 31
+            value >>= 5
+            out.append(BASE64[digit | 32 if value else digit])
+            if not value:
+                break
+    return "".join(out)
+
+
+def encode_mappings(lines):
+    """``lines`` is a list of ``[(generated_column, line, column)]``."""
+    encoded = []
+    line = column = 0
+    for segments in lines:
+        generated = 0
+        parts = []
+        for gen_column, orig_line, orig_column in segments:
+            parts.append(
+                encode_vlq(
+                    [gen_column - generated, 0, orig_line - line, orig_column - column]
+                )
+            )
+            generated, line, column = gen_column, orig_line, orig_column
+        encoded.append(",".join(parts))
+    return ";".join(encoded)
+
+
+# "<p>{{ a }}</p>" minified from
+#
+#   <p>
+#     {{ a }}
+#   </p>
+MINIFIED = "<p>{{ a }}</p>\n"
+MAPPINGS = [
+    [(0, 0, 0), (1, 0, 1), (2, 0, 2), (3, 1, 2), (6, 1, 5), (8, 1, 7), (10, 2, 0)]
+]
+
+# with an emoji, two UTF-16 code units in the generated columns
+EMOJI = "<p>\U0001f600{{ a }}</p>\n"
+EMOJI_MAPPINGS = [[(0, 0, 0), (3, 1, 2), (5, 1, 4), (8, 1, 7), (9, 1, 8)]]
+
+
+class SourceMapTestCase(TestCase):
+    def test_decode_vlq(self):
+        self.assertEqual(decode_vlq("AAAA"), [0, 0, 0, 0])
+        self.assertEqual(decode_vlq("SAAS"), [9, 0, 0, 9])
+        self.assertEqual(decode_vlq("D"), [-1])
+        self.assertEqual(decode_vlq("gB"), [16])
+        self.assertEqual(decode_vlq(encode_vlq([123456, -7890])), [123456, -7890])
+
+    def test_decode_vlq_invalid(self):
+        self.assertRaises(ValueError, decode_vlq, "A!")
+        self.assertRaises(ValueError, decode_vlq, "g")
+
+    def test_lookup(self):
+        sourcemap = SourceMap(
+            {
+                "version": 3,
+                "sourceRoot": "src",
+                "sources": ["App.vue"],
+                "mappings": "A;" + encode_mappings(MAPPINGS),
+            }
+        )
+        self.assertIsNone(sourcemap.lookup(0, 5))
+        self.assertEqual(sourcemap.lookup(1, 0), ("src/App.vue", 0, 0))
+        self.assertEqual(sourcemap.lookup(1, 4), ("src/App.vue", 1, 2))
+        self.assertEqual(sourcemap.lookup(1, 99), ("src/App.vue", 2, 0))
+        self.assertIsNone(sourcemap.lookup(7, 0))
+
+    def test_get_mapped_tokens(self):
+        sourcemap = json.dumps(
+            {
+                "version": 3,
+                "sources": ["App.vue"],
+                "mappings": encode_mappings(MAPPINGS),
+            }
+        )
+        lexer = VueLexer(sourcemap=sourcemap)
+        tokens = list(lexer.get_mapped_tokens(MINIFIED + MINIFIED))
+        self.assertEqual("".join(value for _, value, _ in tokens), MINIFIED * 2)
+        self.assertEqual(tokens[0], (Token.Punctuation, "<", ("App.vue", 0, 0)))
+        self.assertIn((Token.Name.Other, "a", ("App.vue", 1, 5)), tokens)
+        self.assertIn((Token.Name.Tag, "p", ("App.vue", 2, 0)), tokens)
+        # the second line is not mapped
+        self.assertEqual(tokens[-2][2], None)
+
+    def test_get_mapped_tokens_utf16(self):
+        sourcemap = {
+            "version": 3,
+            "sources": ["App.vue"],
+            "mappings": encode_mappings(EMOJI_MAPPINGS + MAPPINGS),
+        }
+        lexer = VueLexer(sourcemap=sourcemap)
+        tokens = list(lexer.get_mapped_tokens(EMOJI + MINIFIED))
+        self.assertEqual(tokens[3][2], ("App.vue", 1, 2))
+        self.assertEqual(tokens[4], (Token.Punctuation, "{", ("App.vue", 1, 4)))
+        self.assertIn((Token.Name.Other, "a", ("App.vue", 1, 7)), tokens)
+        # columns of the next line start from zero again
+        self.assertEqual(tokens[17], (Token.Name.Tag, "p", ("App.vue", 0, 1)))
+
+    def test_get_mapped_tokens_without_sourcemap(self):
+        tokens = list(VueLexer().get_mapped_tokens(MINIFIED))
+        self.assertEqual({position for _, _, position in tokens}, {None})
@@ -0,0 +1,124 @@
+import os
+import random
+from unittest import TestCase, mock, skipIf
+
+from pygments.lexer import RegexLexer
+
+from vue import lexer as lexer_mod
+from vue.lexer import VueLexer
+
+CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
+EXAMPLES_DIR = os.path.join(CURRENT_DIR, "..", "examples")
+
+FRAGMENTS = [
+    "<",
+    ">",
+    "/",
+    "/>",
+    "</",
+    "=",
+    " = ",
+    '"',
+    "'",
+    "{",
+    "}",
+    "{{",
+    "}}",
+    " ",
+    "\n",
+    "\t",
+    " ",
+    "div",
+    "my-component",
+    "MyComp",
+    "el-table.column",
+    "svg:rect",
+    "a.",
+    "template",
+    " lang=",
+    "-row",
+    " data-lang=",
+    " :lang=",
+    " xml:lang=",
+    "pug",
+    "jade",
+    "html",
+    '<template lang="pug">',
+    "<template lang='html' />",
+    "@click",
+    ":key",
+    "v-if",
+    ".",
+    "-",
+    "_",
+    "été",
+    "中",
+    "\U0001f600",
+    "!",
+    "@",
+    ":",
+    "$",
+    "`",
+    "\x00",
+    "<script>",
+    "</template>",
+    '"a b"',
+    "'x'",
+]
+
+
+def fuzz_corpus(count, seed=0):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 60)))
+
+
+def pure(lexer, text):
+    with mock.patch.object(lexer_mod, "scan_tag", None):
+        return list(lexer._get_tokens_unprocessed(text, ("root",)))
+
+
+def accelerated(lexer, text):
+    return list(lexer._get_tokens_unprocessed(text, ("root",)))
+
+
+class FallbackTestCase(TestCase):
+    def test_pure_python_fallback(self):
+        lexer = VueLexer()
+        text = '<div class="a" :key="b">x</div>\n'
+        with mock.patch.object(lexer_mod, "scan_tag", None):
+            tokens = list(lexer.get_tokens_unprocessed(text))
+        self.assertEqual(tokens, list(RegexLexer.get_tokens_unprocessed(lexer, text)))
+
+
+@skipIf(lexer_mod.scan_tag is None, "vue._speedups is not built")
+class SpeedupsTestCase(TestCase):
+
+    maxDiff = None
+
+    def test_examples(self):
+        lexer = VueLexer()
+        for name in sorted(os.listdir(EXAMPLES_DIR)):
+            if not name.endswith(".vue"):
+                continue
+            with open(os.path.join(EXAMPLES_DIR, name), "r") as fh:
+                text = fh.read()
+            self.assertEqual(accelerated(lexer, text), pure(lexer, text), name)
+
+    def test_fuzzed(self):
+        lexer = VueLexer()
+        for text in fuzz_corpus(2000):
+            self.assertEqual(accelerated(lexer, text), pure(lexer, text), repr(text))
+
+    def test_tag_names_are_interned(self):
+        tag_names = {}
+        pos, tokens, push = lexer_mod.scan_vue("<my-comp/>", 1, tag_names)
+        self.assertEqual(pos, 10)
+        self.assertEqual(push, 0)
+        self.assertIs(tokens[0][2], tag_names["my-comp"])
+
+    def test_used_by_default(self):
+        text = '<div class="a" :key="b">x</div>\n'
+        self.assertEqual(
+            list(VueLexer().get_tokens_unprocessed(text)), pure(VueLexer(), text)
+        )
@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+
+try:
+    from sphinx.application import Sphinx
+except ImportError:
+    Sphinx = None
+
+CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
+
+with open(os.path.join(CURRENT_DIR, "..", "examples", "example1.vue"), "r") as fh:
+    text_one = fh.read()
+
+BLOCK = ".. code-block:: vue\n\n" + "".join(
+    "    " + line for line in text_one.splitlines(True)
+)
+
+
+@skipIf(Sphinx is None, "Sphinx is not installed")
+class SphinxExtensionTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.srcdir = os.path.join(self.tmpdir, "src")
+        os.mkdir(self.srcdir)
+        with open(os.path.join(self.srcdir, "conf.py"), "w") as fh:
+            fh.write('extensions = ["vue.sphinx"]\n')
+            fh.write('vue_lexer_options = {"max_errors": 3}\n')
+        pages = ["page%d" % i for i in range(4)]
+        with open(os.path.join(self.srcdir, "index.rst"), "w") as fh:
+            fh.write("Index\n=====\n\n.. toctree::\n\n")
+            fh.write("".join("   %s\n" % page for page in pages))
+        for page in pages:
+            with open(os.path.join(self.srcdir, page + ".rst"), "w") as fh:
+                fh.write("%s\n====\n\n%s\n%s" % (page, BLOCK, BLOCK))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def build(self, parallel):
+        status = io.StringIO()
+        app = Sphinx(
+            self.srcdir,
+            self.srcdir,
+            os.path.join(self.tmpdir, "html"),
+            os.path.join(self.tmpdir, "doctrees"),
+            "html",
+            status=status,
+            warning=io.StringIO(),
+            parallel=parallel,
+        )
+        app.build()
+        return app, status.getvalue()
+
+    def test_shared_lexer(self):
+        from sphinx.highlighting import lexers
+
+        from vue.sphinx import SphinxVueLexer
+
+        app, status = self.build(parallel=0)
+        self.assertIsInstance(lexers["vue"], SphinxVueLexer)
+        self.assertIs(lexers["vue"], lexers["vuejs"])
+        self.assertEqual(lexers["vue"].max_errors, 3)
+        self.assertIn("highlighted 8 blocks", status)
+        with open(os.path.join(app.outdir, "page0.html"), "r") as fh:
+            self.assertIn('<span class="nt">template</span>', fh.read())
+
+    def test_parallel_report(self):
+        _, status = self.build(parallel=2)
+        lines = [line for line in status.splitlines() if line.startswith("vue:")]
+        blocks = sum(int(line.split()[4]) for line in lines)
+        self.assertEqual(blocks, 8)
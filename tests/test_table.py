@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+
+import pygments
+from pygments.lexer import bygroups, using
+from pygments.token import Name, Punctuation
+
+from vue import table
+from vue.lexer import VueLexer, tag_groups, using_lexer
+
+CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
+EXAMPLES_DIR = os.path.join(CURRENT_DIR, "..", "examples")
+
+with open(table.TABLE_PATH, "r") as fh:
+    TABLE = json.load(fh)
+
+# the shipped table may come from another Pygments, test with a fresh one
+BUILT = json.loads(json.dumps(table.build(VueLexer)))
+BUILT_CODE = json.loads(json.dumps(table.build(VueLexer, code=True)))
+
+
+class ProcessedVueLexer(VueLexer):
+    pass
+
+
+ProcessedVueLexer._tokens = table.process(ProcessedVueLexer)
+
+
+class TableTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_table(self, built=BUILT, **changes):
+        path = os.path.join(self.tmpdir, "table.json")
+        table.save(dict(built, **changes), path)
+        return path
+
+    def test_up_to_date(self):
+        # run `make table` after changing vue/lexer.py
+        self.assertEqual(TABLE["source"], table.source_hash())
+
+    @skipIf(
+        TABLE["pygments"] != pygments.__version__,
+        "vue/_table.json was built with another Pygments",
+    )
+    def test_same_as_build(self):
+        self.assertEqual(BUILT, TABLE)
+        self.assertIsInstance(VueLexer._tokens, table.LazyTokens)
+
+    def test_lexes_the_same(self):
+        tokens = table.load(using_lexer, self.write_table(BUILT_CODE), tag_groups)
+        for code in (tokens.code, None):
+            tokens.code = code
+            tokens.clear()
+            tokens.compiled.clear()
+
+            class TableVueLexer(VueLexer):
+                _tokens = tokens
+
+            for name in ("example1.vue", "example2.vue", "example3.vue"):
+                path = os.path.join(EXAMPLES_DIR, name)
+                with open(path, "r", encoding="utf-8") as fh:
+                    text = fh.read()
+                self.assertEqual(
+                    list(TableVueLexer().get_tokens(text)),
+                    list(ProcessedVueLexer().get_tokens(text)),
+                )
+
+    def test_lazy(self):
+        tokens = table.load(using_lexer, self.write_table())
+        self.assertEqual(len(tokens), 0)
+        rules = tokens["tag"]
+        self.assertEqual(list(tokens), ["tag"])
+        self.assertIs(tokens["tag"], rules)
+        self.assertEqual(len(rules), len(BUILT["states"]["tag"]))
+
+    def test_stale(self):
+        self.assertIsNone(table.load(using_lexer, self.write_table(pygments="0.1")))
+        self.assertIsNone(table.load(using_lexer, self.write_table(source="0")))
+        self.assertIsNone(table.load(using_lexer, self.write_table(version=0)))
+        self.assertIsNone(table.load(using_lexer, os.path.join(self.tmpdir, "none")))
+
+    def test_code_is_opt_in(self):
+        self.assertNotIn("code", TABLE)
+        self.assertNotIn("code", BUILT)
+        self.assertIsNone(table.load(using_lexer, self.write_table()).code)
+
+    def test_other_interpreter(self):
+        path = self.write_table(BUILT_CODE)
+        self.assertIsNotNone(table.load(using_lexer, path).code)
+        path = self.write_table(BUILT_CODE, sre="other-1")
+        self.assertIsNone(table.load(using_lexer, path).code)
+
+    @skipIf(
+        TABLE["pygments"] != pygments.__version__,
+        "vue/_table.json was built with another Pygments",
+    )
+    def test_subclasses(self):
+        class SubVueLexer(VueLexer):
+            def get_tokens(self, text, unfiltered=False):
+                return super(SubVueLexer, self).get_tokens(text, unfiltered)
+
+        class OtherVueLexer(VueLexer):
+            tokens = dict(VueLexer.tokens, tag=VueLexer.tokens["tag"][1:])
+
+        SubVueLexer()
+        self.assertIs(SubVueLexer.__dict__["_tokens"], VueLexer._tokens)
+        OtherVueLexer()
+        self.assertNotIsInstance(OtherVueLexer._tokens, table.LazyTokens)
+
+    def test_dump_action(self):
+        self.assertEqual(table._dump_action(None), None)
+        self.assertEqual(table._dump_action(Name.Tag), "Name.Tag")
+        self.assertEqual(
+            table._dump_action(bygroups(Punctuation, None)),
+            {"bygroups": ["Punctuation", None]},
+        )
+        self.assertEqual(
+            table._dump_action(tag_groups(Punctuation, Name.Tag)),
+            {"tag_groups": ["Punctuation", "Name.Tag"]},
+        )
+        self.assertEqual(table._dump_action(using_lexer("pug")), {"using_lexer": "pug"})
+        self.assertRaises(ValueError, table._dump_action, using(VueLexer))
+        self.assertRaises(
+            ValueError, table._dump_action, bygroups(using(VueLexer), Name)
+        )
@@ -0,0 +1,436 @@
+/*
+ * Native scanner for the `vue`, `tag` and `attr` states of `VueLexer`.
+ *
+ * `scan_tag(text, pos)` applies the rules of both states, in the same order
+ * and with the same semantics as the regular expressions in `vue/lexer.py`,
+ * starting in `tag` at `pos`. It returns `(pos, tokens, state)` where
+ * `tokens` is a list of `(index, kind, value)` and `state` tells the caller
+ * where scanning stopped:
+ *
+ *   STATE_TAG   still in `tag`, at a character no rule matches (or the end)
+ *   STATE_ATTR  in `attr` pushed on top of `tag`, at a `{`
+ *   STATE_POP   the tag was closed and `tag` must be popped
+ *
+ * `scan_vue(text, pos, tag_names)` applies the rules of `vue` at `pos`, just
+ * after the `<` of a tag. It returns `(pos, tokens, push)` where `push`
+ * tells which states replace `vue` on the stack:
+ *
+ *   PUSH_NONE           none, the tag is complete (or no rule matched)
+ *   PUSH_TAG            `tag`
+ *   PUSH_TEMPLATE_PUG   `template-pug` and `tag`
+ *   PUSH_TEMPLATE_HTML  `template-html` and `tag`
+ *
+ * Tag names are interned in the `tag_names` dict, as `tag_groups` does.
+ *
+ * Anything it does not handle is left to the regular expression loop, so
+ * the output is identical to the pure Python lexer.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+enum {
+    KIND_TEXT, KIND_ATTRIBUTE, KIND_OPERATOR, KIND_PUNCTUATION, KIND_STRING,
+    KIND_TAG
+};
+enum { STATE_TAG, STATE_ATTR, STATE_POP };
+enum { PUSH_NONE, PUSH_TAG, PUSH_TEMPLATE_PUG, PUSH_TEMPLATE_HTML };
+
+typedef struct {
+    PyObject *text;
+    int kind;
+    const void *data;
+    Py_ssize_t length;
+} Source;
+
+static inline Py_UCS4
+char_at(const Source *src, Py_ssize_t i)
+{
+    return i < src->length ? PyUnicode_READ(src->kind, src->data, i) : 0;
+}
+
+/* `\s` */
+static inline int
+is_space(Py_UCS4 ch)
+{
+    return ch && Py_UNICODE_ISSPACE(ch);
+}
+
+/* `\w` */
+static inline int
+is_word(Py_UCS4 ch)
+{
+    return ch && (ch == '_' || Py_UNICODE_ISALNUM(ch));
+}
+
+/* `[\w.:-]`, a character of a tag or attribute name */
+static inline int
+is_name(Py_UCS4 ch)
+{
+    return is_word(ch) || ch == '.' || ch == ':' || ch == '-';
+}
+
+static Py_ssize_t
+skip_space(const Source *src, Py_ssize_t i)
+{
+    while (is_space(char_at(src, i)))
+        i++;
+    return i;
+}
+
+/* Append `(start, kind, text[start:end])` unless the slice is empty, like
+ * `bygroups` does. */
+static int
+emit(PyObject *tokens, const Source *src, Py_ssize_t start, Py_ssize_t end,
+     int kind)
+{
+    PyObject *value, *item;
+    int rc;
+
+    if (end <= start)
+        return 0;
+    value = PyUnicode_Substring(src->text, start, end);
+    if (value == NULL)
+        return -1;
+    item = Py_BuildValue("(niN)", start, kind, value);
+    if (item == NULL)
+        return -1;
+    rc = PyList_Append(tokens, item);
+    Py_DECREF(item);
+    return rc;
+}
+
+/* Append a `Name.Tag` token, with its value interned in `tag_names`. */
+static int
+emit_tag(PyObject *tokens, const Source *src, Py_ssize_t start, Py_ssize_t end,
+         PyObject *tag_names)
+{
+    PyObject *value, *interned, *item;
+    int rc;
+
+    value = PyUnicode_Substring(src->text, start, end);
+    if (value == NULL)
+        return -1;
+    interned = PyDict_SetDefault(tag_names, value, value);
+    Py_XINCREF(interned);
+    Py_DECREF(value);
+    if (interned == NULL)
+        return -1;
+    item = Py_BuildValue("(niN)", start, KIND_TAG, interned);
+    if (item == NULL)
+        return -1;
+    rc = PyList_Append(tokens, item);
+    Py_DECREF(item);
+    return rc;
+}
+
+/* Whether `text[i:]` starts with the ASCII string `s`. */
+static int
+starts_with(const Source *src, Py_ssize_t i, const char *s)
+{
+    for (; *s; s++, i++) {
+        if (char_at(src, i) != (Py_UCS4)*s)
+            return 0;
+    }
+    return 1;
+}
+
+/* `TAG_NAME`, `[\w-]+(?:[.:][\w-]+)*`. Returns its end, `i` if none. No rule
+ * that follows a name can match a name character, so the greedy match is
+ * the one the regular expressions settle on. */
+static Py_ssize_t
+scan_name(const Source *src, Py_ssize_t i)
+{
+    Py_ssize_t end = i;
+    Py_UCS4 ch;
+
+    while (is_word(char_at(src, end)) || char_at(src, end) == '-')
+        end++;
+    if (end == i)
+        return i;
+    for (;;) {
+        ch = char_at(src, end);
+        if ((ch != '.' && ch != ':') ||
+            !(is_word(char_at(src, end + 1)) || char_at(src, end + 1) == '-'))
+            return end;
+        end++;
+        while (is_word(char_at(src, end)) || char_at(src, end) == '-')
+            end++;
+    }
+}
+
+/* The lookaheads of `template_lang(langs)` at `i`, just after `template`:
+ * `(?![\w.:-])(?=[^>]*(?<![\w:.-])lang\s*=\s*["']?(?:pug|...)\b)` for the
+ * `langs`, which end with NULL. */
+static int
+has_lang(const Source *src, Py_ssize_t i, const char *const *langs)
+{
+    Py_ssize_t j, k;
+    Py_UCS4 ch;
+    const char *const *lang;
+
+    if (is_name(char_at(src, i)))
+        return 0;
+    for (j = i; j < src->length && char_at(src, j) != '>'; j++) {
+        if (!starts_with(src, j, "lang") || is_name(char_at(src, j - 1)))
+            continue;
+        k = skip_space(src, j + 4);
+        if (char_at(src, k) != '=')
+            continue;
+        k = skip_space(src, k + 1);
+        ch = char_at(src, k);
+        if (ch == '"' || ch == '\'')
+            k++;
+        for (lang = langs; *lang; lang++) {
+            if (starts_with(src, k, *lang) &&
+                !is_word(char_at(src, k + (Py_ssize_t)strlen(*lang))))
+                return 1;
+        }
+    }
+    return 0;
+}
+
+static const char *const PUG_LANGS[] = {"pug", "jade", NULL};
+static const char *const HTML_LANGS[] = {"html", NULL};
+
+static PyObject *
+scan_vue(PyObject *self, PyObject *args)
+{
+    Source src;
+    Py_ssize_t pos, name, end, slash;
+    PyObject *tag_names, *tokens;
+    int push = PUSH_NONE;
+
+    if (!PyArg_ParseTuple(args, "UnO!:scan_vue", &src.text, &pos, &PyDict_Type,
+                          &tag_names))
+        return NULL;
+    if (PyUnicode_READY(src.text) < 0)
+        return NULL;
+    src.kind = PyUnicode_KIND(src.text);
+    src.data = PyUnicode_DATA(src.text);
+    src.length = PyUnicode_GET_LENGTH(src.text);
+
+    tokens = PyList_New(0);
+    if (tokens == NULL)
+        return NULL;
+
+    /* (template)(?=...) -> #pop, template-pug/template-html, tag */
+    if (starts_with(&src, pos, "template")) {
+        if (has_lang(&src, pos + 8, PUG_LANGS))
+            push = PUSH_TEMPLATE_PUG;
+        else if (has_lang(&src, pos + 8, HTML_LANGS))
+            push = PUSH_TEMPLATE_HTML;
+        if (push != PUSH_NONE) {
+            if (emit_tag(tokens, &src, pos, pos + 8, tag_names) < 0)
+                goto error;
+            pos += 8;
+            goto done;
+        }
+    }
+
+    name = scan_name(&src, pos);
+    if (name > pos) {
+        /* (NAME)(\s*)(/)(\s*)(>) -> #pop */
+        slash = skip_space(&src, name);
+        end = skip_space(&src, slash + 1);
+        if (char_at(&src, slash) == '/' && char_at(&src, end) == '>') {
+            if (emit_tag(tokens, &src, pos, name, tag_names) < 0 ||
+                emit(tokens, &src, name, slash, KIND_TEXT) < 0 ||
+                emit(tokens, &src, slash, slash + 1, KIND_PUNCTUATION) < 0 ||
+                emit(tokens, &src, slash + 1, end, KIND_TEXT) < 0 ||
+                emit(tokens, &src, end, end + 1, KIND_PUNCTUATION) < 0)
+                goto error;
+            pos = end + 1;
+            goto done;
+        }
+        /* (NAME) -> #pop, tag */
+        if (emit_tag(tokens, &src, pos, name, tag_names) < 0)
+            goto error;
+        pos = name;
+        push = PUSH_TAG;
+        goto done;
+    }
+
+    /* (/)(NAME)(\s*)(>) -> #pop */
+    if (char_at(&src, pos) == '/') {
+        name = scan_name(&src, pos + 1);
+        end = skip_space(&src, name);
+        if (name > pos + 1 && char_at(&src, end) == '>') {
+            if (emit(tokens, &src, pos, pos + 1, KIND_PUNCTUATION) < 0 ||
+                emit_tag(tokens, &src, pos + 1, name, tag_names) < 0 ||
+                emit(tokens, &src, name, end, KIND_TEXT) < 0 ||
+                emit(tokens, &src, end, end + 1, KIND_PUNCTUATION) < 0)
+                goto error;
+            pos = end + 1;
+        }
+    }
+    /* otherwise default("#pop") */
+
+done:
+    return Py_BuildValue("(nNi)", pos, tokens, push);
+
+error:
+    Py_DECREF(tokens);
+    return NULL;
+}
+
+/* `attr` state. Returns the new position, or -1 on error. `*state` is set to
+ * STATE_ATTR when stopping at `{`, otherwise `attr` has been popped. */
+static Py_ssize_t
+scan_attr(PyObject *tokens, const Source *src, Py_ssize_t pos, int *state)
+{
+    Py_UCS4 ch = char_at(src, pos), quote;
+    Py_ssize_t end;
+
+    *state = STATE_TAG;
+    if (ch == '{') {
+        *state = STATE_ATTR;
+        return pos;
+    }
+    if (ch == '"' || ch == '\'') {
+        /* '".*?"' / "'.*?'" with DOTALL */
+        quote = ch;
+        for (end = pos + 1; end < src->length; end++) {
+            if (char_at(src, end) == quote) {
+                if (emit(tokens, src, pos, end + 1, KIND_STRING) < 0)
+                    return -1;
+                return end + 1;
+            }
+        }
+    }
+    /* default("#pop") */
+    return pos;
+}
+
+static PyObject *
+scan_tag(PyObject *self, PyObject *args)
+{
+    Source src;
+    Py_ssize_t pos, end, name, eq;
+    PyObject *tokens, *result;
+    Py_UCS4 ch;
+    int state = STATE_TAG;
+
+    if (!PyArg_ParseTuple(args, "Un:scan_tag", &src.text, &pos))
+        return NULL;
+    if (PyUnicode_READY(src.text) < 0)
+        return NULL;
+    src.kind = PyUnicode_KIND(src.text);
+    src.data = PyUnicode_DATA(src.text);
+    src.length = PyUnicode_GET_LENGTH(src.text);
+
+    tokens = PyList_New(0);
+    if (tokens == NULL)
+        return NULL;
+
+    while (pos < src.length) {
+        ch = char_at(&src, pos);
+
+        /* \s+ */
+        if (is_space(ch)) {
+            end = skip_space(&src, pos);
+            if (emit(tokens, &src, pos, end, KIND_TEXT) < 0)
+                goto error;
+            pos = end;
+            continue;
+        }
+
+        /* ([@:]?[\w-]+\s*)(=)(\s*) -> attr */
+        name = (ch == '@' || ch == ':') ? pos + 1 : pos;
+        end = name;
+        while (is_word(char_at(&src, end)) || char_at(&src, end) == '-')
+            end++;
+        if (end > name) {
+            eq = skip_space(&src, end);
+            if (char_at(&src, eq) == '=') {
+                end = skip_space(&src, eq + 1);
+                if (emit(tokens, &src, pos, eq, KIND_ATTRIBUTE) < 0 ||
+                    emit(tokens, &src, eq, eq + 1, KIND_OPERATOR) < 0 ||
+                    emit(tokens, &src, eq + 1, end, KIND_TEXT) < 0)
+                    goto error;
+                pos = scan_attr(tokens, &src, end, &state);
+                if (pos < 0)
+                    goto error;
+                if (state == STATE_ATTR)
+                    break;
+                continue;
+            }
+        }
+
+        /* [{}]+ */
+        if (ch == '{' || ch == '}') {
+            end = pos;
+            while (char_at(&src, end) == '{' || char_at(&src, end) == '}')
+                end++;
+            if (emit(tokens, &src, pos, end, KIND_PUNCTUATION) < 0)
+                goto error;
+            pos = end;
+            continue;
+        }
+
+        /* [\w\.-]+ */
+        if (is_word(ch) || ch == '.' || ch == '-') {
+            end = pos;
+            while (is_word(char_at(&src, end)) || char_at(&src, end) == '.' ||
+                   char_at(&src, end) == '-')
+                end++;
+            if (emit(tokens, &src, pos, end, KIND_ATTRIBUTE) < 0)
+                goto error;
+            pos = end;
+            continue;
+        }
+
+        /* (/?)(\s*)(>) -> #pop */
+        end = (ch == '/') ? pos + 1 : pos;
+        eq = skip_space(&src, end);
+        if (char_at(&src, eq) == '>') {
+            if (emit(tokens, &src, pos, end, KIND_PUNCTUATION) < 0 ||
+                emit(tokens, &src, end, eq, KIND_TEXT) < 0 ||
+                emit(tokens, &src, eq, eq + 1, KIND_PUNCTUATION) < 0)
+                goto error;
+            pos = eq + 1;
+            state = STATE_POP;
+        }
+        break;
+    }
+
+    result = Py_BuildValue("(nNi)", pos, tokens, state);
+    return result;
+
+error:
+    Py_DECREF(tokens);
+    return NULL;
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"scan_tag", scan_tag, METH_VARARGS,
+     "scan_tag(text, pos) -> (pos, tokens, state)\n\n"
+     "Scan the `tag` and `attr` states of VueLexer starting at `pos`."},
+    {"scan_vue", scan_vue, METH_VARARGS,
+     "scan_vue(text, pos, tag_names) -> (pos, tokens, push)\n\n"
+     "Scan the `vue` state of VueLexer at `pos`, after the `<` of a tag."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "vue._speedups",
+    "Native scanner for VueLexer.",
+    -1,
+    speedups_methods
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    PyObject *module = PyModule_Create(&speedups_module);
+
+    if (module == NULL)
+        return NULL;
+    if (PyModule_AddIntConstant(module, "STATE_TAG", STATE_TAG) < 0 ||
+        PyModule_AddIntConstant(module, "STATE_ATTR", STATE_ATTR) < 0 ||
+        PyModule_AddIntConstant(module, "STATE_POP", STATE_POP) < 0) {
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
+}
@@ -0,0 +1,207 @@
+"""Golden-corpus regression runner.
+
+Lex every ``.vue`` file under a directory and compare a compact fingerprint
+of each token stream (a hash plus a histogram of token types) and the time
+it took against a store recorded earlier::
+
+    $ python -m vue.golden corpus/ --store golden.json --update  # record
+    $ python -m vue.golden corpus/ --store golden.json           # check
+
+Checking exits with status 1 when the output of a file changed, or when it
+got slower than ``--threshold`` (a ratio, 0.5 means 50% slower) by more than
+``--min-delta`` seconds. To guard changes to the lexer in CI, record with
+the base revision and check with the new one on the same machine.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from vue.lexer import VueLexer
+
+STORE_VERSION = 1
+
+
+def fingerprint(tokens):
+    """Return ``(hash, histogram)`` of an iterable of ``(tokentype, value)``."""
+    digest = hashlib.blake2b(digest_size=16)
+    histogram = {}
+    for ttype, value in tokens:
+        name = str(ttype)
+        histogram[name] = histogram.get(name, 0) + 1
+        digest.update(("%s\0%s\0" % (name, value)).encode("utf-8"))
+    return digest.hexdigest(), histogram
+
+
+def find_files(directory):
+    """Return the paths of ``.vue`` files under ``directory``, relative to it."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".vue"):
+                path = os.path.join(root, name)
+                paths.append(os.path.relpath(path, directory))
+    return paths
+
+
+def lex_file(path, repeat=1):
+    """Fingerprint ``path``, keeping the best time of ``repeat`` runs."""
+    with open(path, "r", encoding="utf-8") as fh:
+        text = fh.read()
+    lexer = VueLexer()
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = list(lexer.get_tokens(text))
+        elapsed = time.perf_counter() - start
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+    digest, histogram = fingerprint(tokens)
+    return {
+        "hash": digest,
+        "tokens": len(tokens),
+        "histogram": histogram,
+        "seconds": seconds,
+    }
+
+
+def _lex_job(args):
+    return lex_file(*args)
+
+
+def lex_corpus(directory, repeat=1, jobs=1):
+    """Return ``{relative path: fingerprint}`` for a corpus directory."""
+    paths = find_files(directory)
+    args = [(os.path.join(directory, path), repeat) for path in paths]
+    if jobs > 1:
+        with Pool(jobs) as pool:
+            results = pool.map(_lex_job, args, chunksize=16)
+    else:
+        results = [_lex_job(arg) for arg in args]
+    return dict(zip(paths, results))
+
+
+def load_store(path):
+    with open(path, "r") as fh:
+        store = json.load(fh)
+    if store.get("version") != STORE_VERSION:
+        raise ValueError("unsupported golden store version %r" % store.get("version"))
+    return store["files"]
+
+
+def save_store(path, files):
+    with open(path, "w") as fh:
+        json.dump(
+            {"version": STORE_VERSION, "files": files}, fh, indent=1, sort_keys=True
+        )
+        fh.write("\n")
+
+
+def histogram_diff(old, new):
+    """Return ``{tokentype: (old count, new count)}`` for types that differ."""
+    return {
+        name: (old.get(name, 0), new.get(name, 0))
+        for name in sorted(set(old) | set(new))
+        if old.get(name, 0) != new.get(name, 0)
+    }
+
+
+def compare(old, new, threshold=0.5, min_delta=0.001):
+    """
+    Compare two ``{path: fingerprint}`` mappings.
+
+    Return a list of ``(path, kind, detail)`` where ``kind`` is one of
+    ``"added"``, ``"removed"``, ``"changed"`` (``detail`` is the histogram
+    diff) or ``"slower"`` (``detail`` is ``(old seconds, new seconds)``).
+    A ``threshold`` of ``0`` disables timing checks.
+    """
+    problems = []
+    for path in sorted(set(old) | set(new)):
+        if path not in old:
+            problems.append((path, "added", None))
+        elif path not in new:
+            problems.append((path, "removed", None))
+        else:
+            before, after = old[path], new[path]
+            if before["hash"] != after["hash"]:
+                diff = histogram_diff(before["histogram"], after["histogram"])
+                problems.append((path, "changed", diff))
+            if threshold and after["seconds"] - before["seconds"] > min_delta:
+                if after["seconds"] > before["seconds"] * (1 + threshold):
+                    times = (before["seconds"], after["seconds"])
+                    problems.append((path, "slower", times))
+    return problems
+
+
+def format_problem(path, kind, detail):
+    if kind == "changed":
+        counts = ", ".join(
+            "%s %d -> %d" % (name, before, after)
+            for name, (before, after) in detail.items()
+        )
+        return "%s: output changed (%s)" % (path, counts or "same token types")
+    if kind == "slower":
+        return "%s: slower, %.4f s -> %.4f s" % (path, detail[0], detail[1])
+    return "%s: %s" % (path, kind)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m vue.golden", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("corpus", help="directory of .vue files")
+    parser.add_argument(
+        "--store",
+        default="golden.json",
+        help="fingerprint store (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="record the store instead of checking it"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="allowed slowdown ratio, 0 to disable (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.001,
+        help="ignore slowdowns below this many seconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="keep the best time of this many runs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="lex files in this many processes (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    files = lex_corpus(args.corpus, repeat=args.repeat, jobs=args.jobs)
+    if args.update:
+        save_store(args.store, files)
+        print("recorded %d files in %s" % (len(files), args.store))
+        return 0
+
+    problems = compare(load_store(args.store), files, args.threshold, args.min_delta)
+    for problem in problems:
+        print(format_problem(*problem))
+    print("%d files, %d problems" % (len(files), len(problems)))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
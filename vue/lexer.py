@@ -1,20 +1,180 @@
+import os
 import re
+import time
 
+import pygments.lexer
 from pygments.lexer import bygroups, default, include
+from pygments.lexers import get_lexer_by_name
 from pygments.lexers.javascript import JavascriptLexer
-from pygments.token import Name, Operator, Punctuation, String, Text
+from pygments.token import Error, Name, Operator, Punctuation, String, Text, _TokenType
+from pygments.util import get_bool_opt, get_choice_opt, get_int_opt
+
+from vue import metrics, table
+from vue.sourcemap import ASTRAL, SourceMap
+
+try:
+    from vue._speedups import STATE_ATTR, STATE_POP, scan_tag, scan_vue
+except ImportError:  # extension not built, use the regular expressions only
+    scan_tag = None
+
+# Lexers for `<template lang="...">` blocks, by alias
+SUBLEXERS = {}
+
+
+def using_lexer(alias):
+    """
+    Like `pygments.lexer.using`, but the lexer is looked up by alias, and
+    only imported the first time a block needs it.
+    """
+
+    def callback(lexer, match):
+        sublexer = SUBLEXERS.get(alias)
+        if sublexer is None:
+            sublexer = SUBLEXERS[alias] = get_lexer_by_name(alias)
+        start = match.start()
+        for index, ttype, value in sublexer.get_tokens_unprocessed(match.group()):
+            yield start + index, ttype, value
+
+    callback.alias = alias
+    return callback
+
+
+# Kebab-case, PascalCase and namespaced (`el-table.column`, `svg:rect`) names
+TAG_NAME = r"[\w-]+(?:[.:][\w-]+)*"
+
+
+def tag_groups(*args):
+    """
+    Like `pygments.lexer.bygroups`, but `Name.Tag` values are interned in
+    the ``tag_names`` of the lexer, so tag tokens can be compared by identity.
+    `TOKENS` are also the rules of `JavascriptLexer`, which has no
+    ``tag_names`` to intern in, for example in the scripts of an HTML
+    template.
+    """
+
+    def callback(lexer, match):
+        tag_names = getattr(lexer, "tag_names", None)
+        for index, action in enumerate(args, 1):
+            data = match.group(index)
+            if action is None or not data:
+                continue
+            if action is Name.Tag and tag_names is not None:
+                data = tag_names.setdefault(data, data)
+            yield match.start(index), action, data
+
+    callback.tag_groups = args
+    return callback
+
+
+# HTML elements without content, which have no closing tag
+VOID_TAGS = frozenset(
+    [
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    ]
+)
+
+
+def match_tag(items, entered, tags, pending):
+    """
+    Follow the tag the ``vue`` state lexed into ``items``. The name of an
+    opening tag, which ``entered`` the ``tag`` state, waits in ``pending``
+    for its ``>``, see `end_tag`. A closing tag closes the innermost open
+    tag of the same name in ``tags``, with the tags opened after it. When
+    there is none, its name is turned into an ``Error`` token.
+    """
+    for i, (index, ttype, value) in enumerate(items):
+        if ttype is Name.Tag:
+            break
+    else:
+        return
+    if entered:
+        pending.append(value)
+    elif items[0][2] == "/":
+        for j in range(len(tags) - 1, -1, -1):
+            if tags[j] == value:
+                del tags[j:]
+                return
+        items[i] = (index, Error, value)
+
+
+def end_tag(items, tags, pending):
+    """
+    The ``>`` at the end of ``items`` ends the last pending opening tag,
+    which is then open in ``tags`` unless it is self-closing or void.
+    """
+    if not pending:
+        return
+    name = pending.pop()
+    if name.lower() in VOID_TAGS:
+        return
+    for _, _, value in reversed(items[:-1]):
+        if value.strip():
+            if value == "/":
+                return
+            break
+    tags.append(name)
+
+
+def template_lang(langs):
+    """Opening `<template>` tag of a block in one of `langs`, after its `<`.
+
+    Neither `template` nor `lang` may be part of a longer name, such as
+    `<template-row>` or `data-lang=`.
+    """
+    return (
+        r"""(template)(?![\w.:-])(?=[^>]*(?<![\w:.-])lang\s*=\s*["']?(?:%s)\b)"""
+        % "|".join(langs)
+    )
+
+
+# Body of a `<template lang="...">` block, up to its closing tag at the start
+# of a line so that nested `<template>` elements stay in it, but not past
+# the start of the next top-level block
+TEMPLATE_BODY = r"(?:(?!^<(?:template|script|style)\b).)+?(?=^</template>)"
 
 # Use same tokens as `JavascriptLexer`, but with tags and attributes support
 TOKENS = JavascriptLexer.tokens
 
 TOKENS.update(
     {
+        # entered from `root` by `VUE_TAG`, just after the `<` of a tag
         "vue": [
-            (r"(<)([\w-]+)", bygroups(Punctuation, Name.Tag), "tag"),
             (
-                r"(<)(/)([\w]+)(>)",
-                bygroups(Punctuation, Punctuation, Name.Tag, Punctuation),
+                template_lang(["pug", "jade"]),
+                tag_groups(Name.Tag),
+                ("#pop", "template-pug", "tag"),
+            ),
+            (
+                template_lang(["html"]),
+                tag_groups(Name.Tag),
+                ("#pop", "template-html", "tag"),
             ),
+            # self-closing without attributes, no need to enter `tag`
+            (
+                r"(%s)(\s*)(/)(\s*)(>)" % TAG_NAME,
+                tag_groups(Name.Tag, Text, Punctuation, Text, Punctuation),
+                "#pop",
+            ),
+            (r"(%s)" % TAG_NAME, tag_groups(Name.Tag), ("#pop", "tag")),
+            (
+                r"(/)(%s)(\s*)(>)" % TAG_NAME,
+                tag_groups(Punctuation, Name.Tag, Text, Punctuation),
+                "#pop",
+            ),
+            default("#pop"),
         ],
         "tag": [
             (r"\s+", Text),
@@ -33,6 +193,16 @@ TOKENS.update(
             ("'.*?'", String, "#pop"),
             default("#pop"),
         ],
+        "template-pug": [
+            (TEMPLATE_BODY, using_lexer("pug"), "#pop"),
+            (r".+?(?=</template>)", using_lexer("pug"), "#pop"),
+            default("#pop"),
+        ],
+        "template-html": [
+            (TEMPLATE_BODY, using_lexer("html"), "#pop"),
+            (r".+?(?=</template>)", using_lexer("html"), "#pop"),
+            default("#pop"),
+        ],
         "expression": [
             ("{", Punctuation, "#push"),
             ("}", Punctuation, "#pop"),
@@ -40,10 +210,147 @@ TOKENS.update(
         ],
     }
 )
-TOKENS["root"].insert(0, include("vue"))
+# The `<` of a tag the `vue` state lexes, so that `root` tries one rule for
+# tags instead of every rule of `vue` at every position
+VUE_TAG = (r"<(?=[\w-]|/%s\s*>)" % TAG_NAME, Punctuation, "vue")
+
+# `load_lexer_from_file` may run this module again on the same `TOKENS`
+if VUE_TAG not in TOKENS["root"]:
+    TOKENS["root"].insert(0, VUE_TAG)
+
+# Token types by `vue._speedups` kind
+SCAN_KINDS = (Text, Name.Attribute, Operator, Punctuation, String, Name.Tag)
+# States that replace `vue`, by `vue._speedups` push
+SCAN_PUSHES = ((), ("tag",), ("template-pug", "tag"), ("template-html", "tag"))
+
+# Resynchronisation points for `max_errors`
+BLOCK_TAG = re.compile(r"</?(?:template|script|style)\b")
+RESYNC = re.compile(r"\n|^(?=</?(?:template|script|style)\b)", re.MULTILINE)
+# Stacks that pop on their own, they are not a sign of being lost
+SETTLED = [
+    ["root"],
+    ["root", "slashstartsregex"],
+    ["root", "template-pug"],
+    ["root", "template-html"],
+]
+
+# Newer Pygments emit `Whitespace` rather than `Text` when resetting at EOL
+EOL = getattr(pygments.lexer, "Whitespace", Text)
+
+# Token types `absorb_whitespace` merges, `JavascriptLexer` uses either
+WHITESPACE = frozenset([Text, Text.Whitespace])
+
+STRATEGIES = ["auto", "regex", "blocks", "parallel"]
+
+# Top-level blocks end after a closing tag at the start of a line and any
+# blank lines, when markup follows
+BLOCK_SPLIT = re.compile(
+    r"^</(?:template|script|style)>.*\n(?:[^\S\n]*\n)*(?=<)", re.MULTILINE
+)
+
+
+def split_blocks(text):
+    """Return the ``(start, end)`` spans of the top-level blocks of ``text``."""
+    spans = []
+    start = 0
+    for m in BLOCK_SPLIT.finditer(text):
+        spans.append((start, m.end()))
+        start = m.end()
+    if start < len(text) or not spans:
+        spans.append((start, len(text)))
+    return spans
+
+
+def sample(text):
+    """Describe the size and shape of ``text`` for the ``auto`` strategy."""
+    spans = split_blocks(text)
+    return {
+        "length": len(text),
+        "spans": spans,
+        "largest": max(end - start for start, end in spans),
+    }
+
+
+def coalesce_tokens(tokens, absorb_whitespace=False):
+    """Merge adjacent ``(index, tokentype, value)`` items of the same type.
+
+    Empty values are dropped. With ``absorb_whitespace``, whitespace-only
+    ``Text`` between two tokens of the same type is merged into them.
+    """
+    start, ttype, parts = 0, None, []
+    gap = None
+    for index, token, value in tokens:
+        if not value:
+            continue
+        if token is ttype:
+            if gap is not None:
+                parts.append(gap[2])
+                gap = None
+            parts.append(value)
+            continue
+        if absorb_whitespace and gap is None and ttype is not None:
+            if token in WHITESPACE and value.isspace():
+                gap = (index, token, value)
+                continue
+        if ttype is not None:
+            yield start, ttype, "".join(parts)
+        if gap is not None:
+            if token is gap[1]:
+                start, ttype, parts = gap[0], token, [gap[2], value]
+                gap = None
+                continue
+            yield gap
+            gap = None
+        start, ttype, parts = index, token, [value]
+    if ttype is not None:
+        yield start, ttype, "".join(parts)
+    if gap is not None:
+        yield gap
 
 
 class VueLexer(JavascriptLexer):
+    """
+    For Vue single-file components.
+
+    Additional options accepted:
+
+    `coalesce`
+        Merge adjacent tokens of the same type before yielding them, e.g.
+        ``{{`` becomes one ``Punctuation`` token (default: ``False``).
+    `absorb_whitespace`
+        With `coalesce`, also merge whitespace-only ``Text`` into the
+        surrounding tokens when both sides have the same type
+        (default: ``False``).
+    `max_errors`
+        Recover from malformed input: after this many ``Error`` tokens on
+        one line, emit the rest of the line as a single ``Error`` token and
+        restart from the ``root`` state. Being nested in any state at the
+        start of a line opening or closing a ``<template>``, ``<script>``
+        or ``<style>`` block also restarts from ``root``. The number of
+        restarts is kept in `recoveries` (default: ``0``, never recover).
+    `sourcemap`
+        Source map of the text being lexed, as a `vue.sourcemap.SourceMap`,
+        a parsed JSON object or JSON text. Used by `get_mapped_tokens`
+        (default: ``None``).
+    `strategy`
+        How texts are lexed: ``"regex"`` in one pass, ``"blocks"`` one
+        top-level block at a time, ``"parallel"`` with the blocks spread
+        over a pool of processes, or ``"auto"`` to pick one per text from
+        its size and shape. The choice and its timing are kept in
+        `decision` (default: ``"auto"``).
+    `blocks_threshold`
+        Length from which ``"auto"`` considers the ``"blocks"`` strategy
+        (default: ``BLOCKS_THRESHOLD``, ``0`` for never).
+    `parallel_threshold`
+        Length from which ``"auto"`` considers the ``"parallel"`` strategy,
+        shorter texts stay in this process (default: ``PARALLEL_THRESHOLD``
+        when `processes` is set, else ``0`` for never).
+    `processes`
+        Size of the pool for ``"parallel"``, shared by all lexers
+        (default: ``0``, one process per CPU). Setting it lets ``"auto"``
+        pick ``"parallel"``.
+    """
+
     name = "vue"
     aliases = ["vue", "vuejs"]
     filenames = ["*.vue"]
@@ -52,3 +359,433 @@ class VueLexer(JavascriptLexer):
     flags = re.MULTILINE | re.DOTALL | re.UNICODE
 
     tokens = TOKENS
+
+    # `blocks` is not faster than `regex` in `benchmarks/bench_strategy.py`
+    # and costs a second pass when it falls back, so `auto` never picks it
+    # unless `blocks_threshold` is set
+    BLOCKS_THRESHOLD = 0
+    # `auto` starts worker processes only when asked to, see `processes`
+    PARALLEL_THRESHOLD = 200000
+
+    def __init_subclass__(cls, **kwargs):
+        super(VueLexer, cls).__init_subclass__(**kwargs)
+        # subclasses with the same rules share the shipped table instead of
+        # processing `TOKENS` again
+        if TABLE is None or cls.flags != VueLexer.flags:
+            return
+        if "tokens" not in cls.__dict__ and "_tokens" not in cls.__dict__:
+            cls._tokens = TABLE
+
+    def __init__(self, **options):
+        super(VueLexer, self).__init__(**options)
+        self.coalesce = get_bool_opt(options, "coalesce", False)
+        self.absorb_whitespace = get_bool_opt(options, "absorb_whitespace", False)
+        self.max_errors = get_int_opt(options, "max_errors", 0)
+        #: Number of resynchronisations during the last run, see `max_errors`
+        self.recoveries = 0
+        #: Deepest state stack during the last run, kept with `vue.metrics`
+        self.max_depth = 0
+        sourcemap = options.get("sourcemap")
+        if sourcemap is not None and not isinstance(sourcemap, SourceMap):
+            sourcemap = SourceMap(sourcemap)
+        self.sourcemap = sourcemap
+        self.strategy = get_choice_opt(options, "strategy", STRATEGIES, "auto")
+        self.blocks_threshold = get_int_opt(
+            options, "blocks_threshold", self.BLOCKS_THRESHOLD
+        )
+        self.processes = get_int_opt(options, "processes", 0) or None
+        self.parallel_threshold = get_int_opt(
+            options,
+            "parallel_threshold",
+            self.PARALLEL_THRESHOLD if self.processes else 0,
+        )
+        #: How the last text was lexed: the ``strategy``, ``"regex"``,
+        #: ``"blocks"`` or ``"parallel"``, and what it was based on, the
+        #: ``length`` of the text and, when it was sampled, the ``spans`` of
+        #: its top-level blocks and the length of the ``largest`` one.
+        #: ``"auto"`` only splits texts where no block holds more than half
+        #: of the text. When the text is split, the time per block in
+        #: ``blocks`` and in all in ``seconds`` are added once the tokens are
+        #: exhausted, and ``fallback`` when blocks could not be lexed apart.
+        self.decision = None
+        #: Tag names by value, so `Name.Tag` tokens of a same tag share one
+        #: string for as long as this lexer lives
+        self.tag_names = {}
+
+    def intern_tag(self, name):
+        """Return the string kept in `tag_names` for tag name ``name``."""
+        return self.tag_names.setdefault(name, name)
+
+    def get_mapped_tokens(self, text):
+        """
+        Return an iterable of ``(tokentype, value, position)`` where
+        ``position`` is the original ``(source, line, column)`` of the token
+        according to the `sourcemap` option, or ``None`` if it is unmapped.
+
+        Positions refer to ``text`` as given, so unlike `get_tokens` it is
+        neither stripped nor tab-expanded, and no filters are applied.
+        Columns are converted to UTF-16 code units before the lookup.
+        """
+        lookup = self.sourcemap.lookup if self.sourcemap is not None else None
+        # characters outside the BMP before the token on its line, which
+        # count twice in source map columns
+        astral = lookup is not None and ASTRAL.search(text) is not None
+        line = line_start = extra = 0
+        for index, ttype, value in self.get_tokens_unprocessed(text):
+            if lookup is None:
+                position = None
+            else:
+                position = lookup(line, index - line_start + extra)
+            yield ttype, value, position
+            newlines = value.count("\n")
+            if newlines:
+                line += newlines
+                line_start = index + value.rindex("\n") + 1
+                extra = 0
+            if astral:
+                start = max(index, line_start)
+                extra += len(ASTRAL.findall(text, start, index + len(value)))
+
+    def _decide(self, text, stack):
+        """Return the `decision` for lexing ``text`` from ``stack``."""
+        decision = {"strategy": "regex", "length": len(text)}
+        if self.strategy == "regex" or tuple(stack) != ("root",):
+            return decision
+        if self.strategy == "auto":
+            thresholds = (self.blocks_threshold, self.parallel_threshold)
+            thresholds = [threshold for threshold in thresholds if threshold]
+            if not thresholds or len(text) < min(thresholds):
+                return decision
+        decision.update(sample(text))
+        if self.strategy != "auto":
+            decision["strategy"] = self.strategy
+        elif decision["largest"] * 2 <= len(text):
+            processes = self.processes or os.cpu_count() or 1
+            threshold = self.parallel_threshold
+            if threshold and len(text) >= threshold and processes > 1:
+                decision["strategy"] = "parallel"
+            elif self.blocks_threshold and len(text) >= self.blocks_threshold:
+                decision["strategy"] = "blocks"
+        return decision
+
+    def get_tokens_unprocessed(self, text, stack=("root",)):
+        # kept apart from `self.decision`, which the next call replaces
+        decision = self.decision = self._decide(text, stack)
+        run = {}
+        if decision["strategy"] == "blocks":
+            tokens = self._get_block_tokens(text, decision, run)
+        elif decision["strategy"] == "parallel":
+            tokens = self._get_parallel_tokens(text, decision, run)
+        else:
+            tokens = self._get_tokens_unprocessed(text, stack, run=run)
+        return self._finish(text, tokens, run)
+
+    def _finish(self, text, tokens, run):
+        """
+        Apply `coalesce` to the ``tokens`` of ``text``, and count them with
+        the ``recoveries`` and ``depth`` in ``run`` once they are exhausted.
+        """
+        if self.coalesce:
+            tokens = coalesce_tokens(tokens, self.absorb_whitespace)
+        collector = metrics.collector
+        if collector is not None:
+            tokens = metrics.count_tokens(collector, run, text, tokens)
+        return tokens
+
+    def _get_block_tokens(self, text, decision, totals):
+        """
+        Lex ``text`` one top-level block at a time. Each block is lexed from
+        ``root`` up to its end, which is the same as lexing the whole text
+        if the previous block stopped exactly at its own end, in ``root``
+        and with no tag left open.
+        From the first block that did not, the rest of the text is lexed
+        in one piece. Time spent per block is kept in ``decision``, the
+        ``recoveries`` and ``depth`` of all blocks in ``totals``.
+        """
+        began = time.perf_counter()
+        recoveries = depth = 0
+        timings = decision["blocks"] = []
+        for start, end in decision["spans"]:
+            block_began = time.perf_counter()
+            run = {}
+            tokens = list(self._get_tokens_unprocessed(text, ["root"], start, end, run))
+            if (run["pos"], run["stack"], run["tags"]) != (end, ["root"], []):
+                decision["fallback"] = start
+                run = {}
+                tokens = self._get_tokens_unprocessed(text, ["root"], start, run=run)
+                end = len(text)
+            for item in tokens:
+                yield item
+            timings.append(time.perf_counter() - block_began)
+            recoveries += run["recoveries"]
+            depth = max(depth, run["depth"])
+            if end == len(text):
+                break
+        self.recoveries = recoveries
+        self.max_depth = depth
+        totals.update(recoveries=recoveries, depth=depth)
+        decision["seconds"] = time.perf_counter() - began
+
+    def _get_parallel_tokens(self, text, decision, totals):
+        """
+        Same as `_get_block_tokens`, but the blocks after the first one are
+        lexed by `vue.parallel` worker processes while this one lexes the
+        first. The text is shared with the workers once, and each block is
+        lexed against the whole of it, so the check after each block is the
+        same as in `_get_block_tokens`. When the pool cannot be used or a
+        worker fails, the rest of the text is lexed here.
+        """
+        from vue import parallel
+
+        began = time.perf_counter()
+        spans = decision["spans"]
+        timings = decision["blocks"] = []
+        shared = None
+        futures = []
+        try:
+            pool = parallel.get_pool(self.processes)
+            shared, size = parallel.share_text(text)
+            for start, end in spans[1:]:
+                futures.append(
+                    pool.submit(
+                        parallel.lex_block,
+                        shared.name,
+                        size,
+                        start,
+                        end,
+                        type(self),
+                        self.max_errors,
+                    )
+                )
+        except Exception as e:
+            # no `sem_open`, no shared memory, pool shut down by another
+            # thread...
+            for future in futures:
+                future.cancel()
+            futures = []
+            if isinstance(e, parallel.BrokenProcessPool):
+                parallel.shutdown()
+        recoveries = depth = 0
+        try:
+            for i, (start, end) in enumerate(spans):
+                block_began = time.perf_counter()
+                result = None
+                if i == 0:
+                    result = {}
+                    tokens = list(
+                        self._get_tokens_unprocessed(text, ["root"], start, end, result)
+                    )
+                elif futures:
+                    try:
+                        result = futures[i - 1].result()
+                    except Exception as e:
+                        # the worker failed or its class could not be sent,
+                        # lex the rest here
+                        if isinstance(e, parallel.BrokenProcessPool):
+                            parallel.shutdown()
+                    else:
+                        tokens = parallel.load_tokens(result["tokens"], self.tag_names)
+                stopped = None
+                if result is not None:
+                    stopped = (result["pos"], result["stack"], result["tags"])
+                if stopped != (end, ["root"], []):
+                    decision["fallback"] = start
+                    run = {}
+                    for item in self._get_tokens_unprocessed(
+                        text, ["root"], start, run=run
+                    ):
+                        yield item
+                    timings.append(time.perf_counter() - block_began)
+                    recoveries += run["recoveries"]
+                    depth = max(depth, run["depth"])
+                    break
+                for item in tokens:
+                    yield item
+                timings.append(result.get("seconds", time.perf_counter() - block_began))
+                recoveries += result["recoveries"]
+                depth = max(depth, result["depth"])
+        finally:
+            # workers that did not attach the text yet fail, their results
+            # are not needed anymore
+            for future in futures:
+                future.cancel()
+            if shared is not None:
+                parallel.release(shared)
+        self.recoveries = recoveries
+        self.max_depth = depth
+        totals.update(recoveries=recoveries, depth=depth)
+        decision["seconds"] = time.perf_counter() - began
+
+    def _get_tokens_unprocessed(
+        self, text, stack, pos=0, stop=None, run=None, tags=(), pending=()
+    ):
+        """
+        Same as ``RegexLexer.get_tokens_unprocessed``, but the ``vue``,
+        ``tag`` and ``attr`` states are scanned by ``vue._speedups`` when it
+        is built, and errors are recovered from when `max_errors` is set.
+        The depth of the state stack is kept in `max_depth`. Closing tags
+        are matched against the open ``tags``, see `match_tag`.
+
+        Lexing starts at ``pos`` and stops at the first token boundary at
+        or after ``stop``. The position, the stack, the open ``tags`` and
+        the ``pending`` opening tags it stopped with, the ``recoveries`` and
+        the ``depth`` are then kept in the ``run`` dict, as the lexer may be
+        running other texts meanwhile.
+        """
+        if stop is None:
+            stop = len(text) + 1
+        tokendefs = self._tokens
+        statestack = list(stack)
+        tags = list(tags)
+        pending = list(pending)
+        statetokens = tokendefs[statestack[-1]]
+        max_errors = self.max_errors
+        errors = last_error = 0
+        depth = len(statestack)
+        recoveries = 0
+        while 1:
+            if pos >= stop:
+                break
+            if max_errors and statestack not in SETTLED:
+                # a top-level block tag at the start of a line means we got
+                # lost somewhere inside the previous block
+                if pos and text[pos - 1] == "\n" and BLOCK_TAG.match(text, pos):
+                    statestack = ["root"]
+                    del pending[:]
+                    statetokens = tokendefs["root"]
+                    errors = 0
+                    recoveries += 1
+            if scan_tag is not None and statestack[-1] == "tag":
+                start = pos
+                pos, items, state = scan_tag(text, pos)
+                for index, kind, value in items:
+                    yield index, SCAN_KINDS[kind], value
+                if state == STATE_POP:
+                    end_tag(items, tags, pending)
+                    if len(statestack) > 1:
+                        statestack.pop()
+                    statetokens = tokendefs[statestack[-1]]
+                    continue
+                if state == STATE_ATTR:
+                    statestack.append("attr")
+                    statetokens = tokendefs["attr"]
+                    if len(statestack) > depth:
+                        depth = len(statestack)
+                elif pos != start:
+                    continue
+                # fall through so the rules below always make progress
+            elif scan_tag is not None and statestack[-1] == "vue":
+                pos, items, push = scan_vue(text, pos, self.tag_names)
+                items = [
+                    (index, SCAN_KINDS[kind], value) for index, kind, value in items
+                ]
+                match_tag(items, push, tags, pending)
+                for item in items:
+                    yield item
+                if len(statestack) > 1:
+                    statestack.pop()
+                if push:
+                    statestack.extend(SCAN_PUSHES[push])
+                    if len(statestack) > depth:
+                        depth = len(statestack)
+                statetokens = tokendefs[statestack[-1]]
+                continue
+            for rexmatch, action, new_state in statetokens:
+                m = rexmatch(text, pos)
+                if m:
+                    if action is not None:
+                        if type(action) is _TokenType:
+                            yield pos, action, m.group()
+                        elif statestack[-1] == "vue":
+                            items = list(action(self, m))
+                            entered = isinstance(new_state, tuple)
+                            match_tag(items, entered, tags, pending)
+                            for item in items:
+                                yield item
+                        elif statestack[-1] == "tag" and isinstance(new_state, int):
+                            # `>`, the only rule that leaves `tag`
+                            items = list(action(self, m))
+                            end_tag(items, tags, pending)
+                            for item in items:
+                                yield item
+                        else:
+                            for item in action(self, m):
+                                yield item
+                    pos = m.end()
+                    if new_state is not None:
+                        # state transition
+                        if isinstance(new_state, tuple):
+                            for state in new_state:
+                                if state == "#pop":
+                                    if len(statestack) > 1:
+                                        statestack.pop()
+                                elif state == "#push":
+                                    statestack.append(statestack[-1])
+                                else:
+                                    statestack.append(state)
+                            if len(statestack) > depth:
+                                depth = len(statestack)
+                        elif isinstance(new_state, int):
+                            # pop, but keep at least one state on the stack
+                            if abs(new_state) >= len(statestack):
+                                del statestack[1:]
+                            else:
+                                del statestack[new_state:]
+                        elif new_state == "#push":
+                            statestack.append(statestack[-1])
+                            if len(statestack) > depth:
+                                depth = len(statestack)
+                        else:
+                            assert False, "wrong state def: %r" % new_state
+                        statetokens = tokendefs[statestack[-1]]
+                    break
+            else:
+                # no rule matched
+                try:
+                    if text[pos] == "\n":
+                        # at EOL, reset state to "root"
+                        statestack = ["root"]
+                        del pending[:]
+                        statetokens = tokendefs["root"]
+                        yield pos, EOL, "\n"
+                        pos += 1
+                        errors = 0
+                        continue
+                    yield pos, Error, text[pos]
+                    pos += 1
+                except IndexError:
+                    break
+                if max_errors:
+                    if text.find("\n", last_error, pos) != -1:
+                        errors = 0
+                    errors += 1
+                    last_error = pos
+                    if errors >= max_errors:
+                        # skip the rest of the line as a single token
+                        m = RESYNC.search(text, pos)
+                        end = m.start() if m else len(text)
+                        if end > pos:
+                            yield pos, Error, text[pos:end]
+                        pos = end
+                        statestack = ["root"]
+                        del pending[:]
+                        statetokens = tokendefs["root"]
+                        errors = 0
+                        recoveries += 1
+        self.recoveries = recoveries
+        self.max_depth = depth
+        if run is not None:
+            run.update(
+                pos=pos,
+                stack=statestack,
+                tags=tags,
+                pending=pending,
+                recoveries=recoveries,
+                depth=depth,
+            )
+
+
+# Skip processing `TOKENS` when the table in `vue/_table.json` is up to date
+TABLE = table.load(using_lexer, tag_groups=tag_groups)
+if TABLE is not None:
+    VueLexer._tokens = TABLE
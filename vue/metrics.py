@@ -0,0 +1,161 @@
+"""Opt-in, in-process counters for `vue.lexer.VueLexer`.
+
+Nothing is counted until `enable` is called::
+
+    from vue import metrics
+
+    collector = metrics.enable()
+    ...
+    collector.as_dict()          # for logging
+    collector.to_openmetrics()   # for scraping by a local agent
+
+While disabled, each call to ``get_tokens_unprocessed`` only checks whether
+`collector` is ``None``.
+"""
+
+import threading
+import time
+
+from pygments.token import Error
+
+
+class Metrics(object):
+    """
+    Totals over every text lexed while enabled. Each call to
+    ``VueLexer.get_tokens_unprocessed`` is counted once, when its tokens
+    are exhausted. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            #: texts lexed
+            self.texts = 0
+            #: UTF-8 size of the texts lexed
+            self.bytes = 0
+            #: tokens yielded, by token type
+            self.tokens = {}
+            #: ``Error`` tokens yielded
+            self.errors = 0
+            #: restarts from ``root``, see the ``max_errors`` option
+            self.recoveries = 0
+            #: deepest state stack seen
+            self.max_depth = 0
+            #: time spent producing tokens, excluding the consumer's
+            self.seconds = 0.0
+
+    def record(self, text, tokens, errors, recoveries, depth, seconds):
+        """Add the totals of one text, ``tokens`` is ``{tokentype: count}``."""
+        size = len(text.encode("utf-8", "surrogatepass"))
+        with self._lock:
+            self.texts += 1
+            self.bytes += size
+            for ttype, count in tokens.items():
+                self.tokens[ttype] = self.tokens.get(ttype, 0) + count
+            self.errors += errors
+            self.recoveries += recoveries
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self.seconds += seconds
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "texts": self.texts,
+                "bytes": self.bytes,
+                "tokens": {str(ttype): n for ttype, n in self.tokens.items()},
+                "errors": self.errors,
+                "recoveries": self.recoveries,
+                "max_depth": self.max_depth,
+                "seconds": self.seconds,
+            }
+
+    def to_openmetrics(self, prefix="vue"):
+        """Return the counters in the OpenMetrics text exposition format."""
+        data = self.as_dict()
+        lines = []
+
+        def family(name, kind, help, samples):
+            lines.append("# TYPE %s_%s %s" % (prefix, name, kind))
+            lines.append("# HELP %s_%s %s" % (prefix, name, help))
+            for suffix, labels, value in samples:
+                lines.append("%s_%s%s%s %s" % (prefix, name, suffix, labels, value))
+
+        def total(name, help):
+            family(name, "counter", help, [("_total", "", data[name])])
+
+        total("texts", "Texts lexed.")
+        total("bytes", "UTF-8 bytes lexed.")
+        family(
+            "tokens",
+            "counter",
+            "Tokens yielded by token type.",
+            [
+                ("_total", '{type="%s"}' % name, count)
+                for name, count in sorted(data["tokens"].items())
+            ],
+        )
+        total("errors", "Error tokens yielded.")
+        total("recoveries", "Restarts from the root state after errors.")
+        family(
+            "max_depth",
+            "gauge",
+            "Deepest state stack seen.",
+            [("", "", data["max_depth"])],
+        )
+        family(
+            "seconds",
+            "counter",
+            "Time spent lexing.",
+            [("_total", "", repr(data["seconds"]))],
+        )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+#: The enabled `Metrics`, or ``None``
+collector = None
+
+
+def enable():
+    """Start counting, return the shared `Metrics`."""
+    global collector
+    if collector is None:
+        collector = Metrics()
+    return collector
+
+
+def disable():
+    """Stop counting, the totals so far are dropped."""
+    global collector
+    collector = None
+
+
+def count_tokens(collector, run, text, tokens):
+    """
+    Pass ``(index, tokentype, value)`` items through, counting them. The
+    lexer leaves the ``recoveries`` and ``depth`` of this call in ``run``
+    by the time they are exhausted.
+    """
+    clock = time.perf_counter
+    counts = {}
+    errors = 0
+    seconds = 0.0
+    tokens = iter(tokens)
+    while True:
+        start = clock()
+        try:
+            item = next(tokens)
+        except StopIteration:
+            seconds += clock() - start
+            break
+        seconds += clock() - start
+        ttype = item[1]
+        counts[ttype] = counts.get(ttype, 0) + 1
+        if ttype is Error:
+            errors += 1
+        yield item
+    collector.record(text, counts, errors, run["recoveries"], run["depth"], seconds)
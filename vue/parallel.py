@@ -0,0 +1,124 @@
+"""Process pool for the ``parallel`` strategy of `vue.lexer.VueLexer`.
+
+Imported the first time a text is lexed in parallel, so the other
+strategies do not pay for starting `multiprocessing`. Token types cross
+process boundaries as their dotted names, as `_TokenType` instances must
+stay singletons for ``is`` comparisons to hold. Tag names are interned
+again on the way back, for the same reason.
+
+The text goes to the workers once per call, through shared memory, and
+each worker lexes its blocks against the whole text. Only the tokens of
+a block come back.
+"""
+
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool  # noqa: F401
+from multiprocessing import shared_memory
+
+from pygments.token import Name, string_to_tokentype
+
+_pool = None
+_processes = None
+
+# Lexers of a worker process, by class and `max_errors`
+_lexers = {}
+
+# Last text of a worker process, as ``(shared memory name, text)``
+_text = (None, None)
+
+
+def get_pool(processes=None):
+    """Return the shared pool, with ``processes`` workers (all CPUs if ``None``)."""
+    global _pool, _processes
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if _pool is None or processes != _processes:
+        shutdown()
+        _pool = ProcessPoolExecutor(processes)
+        _processes = processes
+    return _pool
+
+
+@atexit.register
+def shutdown():
+    """Stop the worker processes, if any were started."""
+    global _pool, _processes
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+    _pool = _processes = None
+
+
+def share_text(text):
+    """
+    Copy ``text`` to shared memory for `lex_block`. Return the
+    `SharedMemory` and the size of the text in it. The caller closes and
+    unlinks it once the blocks are lexed, see `release`.
+    """
+    data = text.encode("utf-8", "surrogatepass")
+    shared = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    shared.buf[: len(data)] = data
+    return shared, len(data)
+
+
+def release(shared):
+    """Free the shared memory of `share_text`."""
+    shared.close()
+    shared.unlink()
+
+
+def _get_text(memory, size):
+    global _text
+    if _text[0] != memory:
+        shared = shared_memory.SharedMemory(memory)
+        try:
+            text = bytes(shared.buf[:size]).decode("utf-8", "surrogatepass")
+        finally:
+            shared.close()
+        _text = (memory, text)
+    return _text[1]
+
+
+def lex_block(memory, size, pos, stop, cls, max_errors):
+    """
+    Lex the text `share_text` left in shared memory ``memory`` from ``pos``
+    to ``stop`` in a worker process, with a ``cls`` lexer. Return the
+    tokens as ``(index, tokentype name, value)`` and where lexing stopped,
+    as `VueLexer._get_tokens_unprocessed` leaves them.
+    """
+    text = _get_text(memory, size)
+    lexer = _lexers.get((cls, max_errors))
+    if lexer is None:
+        lexer = _lexers[cls, max_errors] = cls(max_errors=max_errors)
+    # workers live as long as the pool, keep their tag names to one block
+    lexer.tag_names.clear()
+    start = time.perf_counter()
+    names = {}
+    tokens = []
+    result = {"tokens": tokens}
+    for index, ttype, value in lexer._get_tokens_unprocessed(
+        text, ["root"], pos, stop, result
+    ):
+        name = names.get(ttype)
+        if name is None:
+            name = names[ttype] = ".".join(ttype)
+        tokens.append((index, name, value))
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def load_tokens(tokens, tag_names):
+    """
+    Turn the tokens of `lex_block` back into ``(index, tokentype, value)``,
+    with tag names interned in ``tag_names``.
+    """
+    types = {}
+    for index, name, value in tokens:
+        ttype = types.get(name)
+        if ttype is None:
+            ttype = types[name] = string_to_tokentype(name)
+        if ttype is Name.Tag:
+            value = tag_names.setdefault(value, value)
+        yield index, ttype, value
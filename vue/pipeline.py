@@ -0,0 +1,127 @@
+"""Streaming highlight pipeline.
+
+Every stage is a generator, so a component can be highlighted from a file
+object straight into an output stream without materialising the source,
+the token list or the formatted output::
+
+    from pygments.formatters import HtmlFormatter
+    from vue import pipeline
+
+    with open("App.vue") as src, open("App.html", "w") as out:
+        pipeline.highlight(src, HtmlFormatter(), out)
+
+The source is buffered one top-level block (``<template>``, ``<script>`` or
+``<style>``) at a time, with the next block in view, so peak memory is
+bounded by the largest pair of blocks rather than by the size of the file.
+A block is lexed in the same text as the next one, up to its end. When
+lexing does not stop exactly there, back in the ``root`` state, it carries
+on from where and in the state it stopped with the next block, so each
+block is lexed once. The output is the same as lexing the whole file,
+unless a token starting in a block would run past the end of the next
+one, for example a string opened by a stray apostrophe.
+"""
+
+import re
+
+from pygments.filter import apply_filters
+from pygments.filters import get_filter_by_name
+
+from vue.lexer import VueLexer
+
+# A top-level block ends with its closing tag at the start of a line
+BLOCK_END = re.compile(r"</(?:template|script|style)>")
+
+
+def iter_blocks(lines):
+    """Group an iterable of lines into top-level blocks.
+
+    A block ends after a closing tag at the start of a line and the blank
+    lines following it, so each block starts on markup. This is where a
+    top-level block usually ends, but not always, e.g. an unindented nested
+    ``</template>``. `lex` checks where lexing actually stops.
+    """
+    buf = []
+    closed = False
+    for line in lines:
+        if closed and not line.isspace():
+            yield "".join(buf)
+            buf = []
+            closed = False
+        buf.append(line)
+        if BLOCK_END.match(line):
+            closed = True
+    if buf:
+        yield "".join(buf)
+
+
+def lex(lines, lexer=None):
+    """Yield ``(tokentype, value)`` pairs for an iterable of lines.
+
+    Unlike ``Lexer.get_tokens`` the input is not stripped or tab-expanded;
+    lines are lexed as read. Filters registered on ``lexer`` are applied.
+    Blocks are checked as described above, so ``lexer`` must be a
+    `VueLexer`.
+    """
+    if lexer is None:
+        lexer = VueLexer()
+
+    def stream():
+        for _, ttype, value in _lex_blocks(lexer, iter_blocks(lines)):
+            yield ttype, value
+
+    return apply_filters(stream(), lexer.filters, lexer)
+
+
+def _lex_blocks(lexer, blocks):
+    # `text` is not lexed yet from `pos` on, the character before it is
+    # kept for lookbehinds and ``^``. It is lexed from `stack`, with the
+    # open `tags` and the `pending` ones, up to the last block read, which
+    # stays in view.
+    text = ""
+    pos = 0
+    stack = ["root"]
+    tags = pending = ()
+    for block in blocks:
+        text += block
+        stop = len(text) - len(block)
+        if stop <= pos:
+            continue
+        run = {}
+        tokens = list(
+            lexer._get_tokens_unprocessed(text, stack, pos, stop, run, tags, pending)
+        )
+        end = run["pos"]
+        for item in lexer._finish(text[pos:end], tokens, run):
+            yield item
+        start = end - 1
+        text = text[start:]
+        pos = 1
+        stack = run["stack"]
+        tags = run["tags"]
+        pending = run["pending"]
+    if pos < len(text):
+        run = {}
+        tokens = lexer._get_tokens_unprocessed(
+            text, stack, pos, run=run, tags=tags, pending=pending
+        )
+        for item in lexer._finish(text[pos:], tokens, run):
+            yield item
+
+
+def filter(tokens, *filters):
+    """Run ``tokens`` through Pygments filters (instances or names)."""
+    for f in filters:
+        if isinstance(f, str):
+            f = get_filter_by_name(f)
+        tokens = f.filter(None, tokens)
+    return tokens
+
+
+def write(tokens, formatter, outfile):
+    """Format ``tokens`` into ``outfile`` as they arrive."""
+    formatter.format(tokens, outfile)
+
+
+def highlight(lines, formatter, outfile, lexer=None, filters=()):
+    """Lex, filter and format ``lines`` into ``outfile`` in one pass."""
+    write(filter(lex(lines, lexer), *filters), formatter, outfile)
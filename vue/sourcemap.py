@@ -0,0 +1,89 @@
+"""Lookups in source maps (revision 3) of preprocessed templates.
+
+Lines and columns are zero-based, as in the ``mappings`` field. Columns are
+counted in UTF-16 code units, as JavaScript strings are, so a character
+outside the Basic Multilingual Plane, such as an emoji, counts twice.
+"""
+
+import json
+import re
+from bisect import bisect_right
+
+BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+BASE64_DIGITS = {c: i for i, c in enumerate(BASE64)}
+
+# Characters that take two UTF-16 code units
+ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+def decode_vlq(segment):
+    """Decode a base64 VLQ ``segment`` into a list of integers."""
+    values = []
+    value = shift = 0
+    for char in segment:
+        try:
+            digit = BASE64_DIGITS[char]
+        except KeyError:
+            raise ValueError("invalid base64 VLQ character %r" % char)
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        value = shift = 0
+    if shift:
+        raise ValueError("truncated base64 VLQ segment %r" % segment)
+    return values
+
+
+class SourceMap(object):
+    """
+    Decoded source map. ``data`` is the parsed JSON object or its text.
+
+    Segments are indexed per generated line, so `lookup` is a binary search
+    on one line rather than a scan of the whole mapping.
+    """
+
+    def __init__(self, data):
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        root = data.get("sourceRoot") or ""
+        if root and not root.endswith("/"):
+            root += "/"
+        self.sources = [root + source for source in data.get("sources", [])]
+        self.names = data.get("names", [])
+        #: ``(columns, positions)`` per generated line
+        self.lines = []
+
+        source = line = column = 0
+        for encoded in data.get("mappings", "").split(";"):
+            columns, positions = [], []
+            generated = 0
+            for segment in encoded.split(","):
+                if not segment:
+                    continue
+                fields = decode_vlq(segment)
+                generated += fields[0]
+                if len(fields) >= 4:
+                    source += fields[1]
+                    line += fields[2]
+                    column += fields[3]
+                    position = (self.sources[source], line, column)
+                else:
+                    position = None
+                columns.append(generated)
+                positions.append(position)
+            self.lines.append((columns, positions))
+
+    def lookup(self, line, column):
+        """
+        Return the original ``(source, line, column)`` of the segment
+        covering a generated position, or ``None`` if it is not mapped.
+        """
+        if line >= len(self.lines):
+            return None
+        columns, positions = self.lines[line]
+        i = bisect_right(columns, column) - 1
+        if i < 0:
+            return None
+        return positions[i]
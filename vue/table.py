@@ -0,0 +1,242 @@
+"""Serialised state table of `vue.lexer.VueLexer`.
+
+Processing the token definitions compiles every regular expression of the
+lexer, and happens in each new process the first time it is instantiated.
+The processed table (patterns, flags, actions and new states) is written
+once to ``vue/_table.json``::
+
+    $ make table
+
+and loaded instead when the Pygments version and ``vue/lexer.py`` are the
+ones it was built from. Each state is then compiled the first time it is
+entered. When they differ the table is ignored, and the lexer is processed
+as usual.
+
+Most of the time goes into compiling the regular expressions, the
+identifier rules of `JavascriptLexer` alone take several milliseconds. A
+table built with ``--code`` also keeps the compiled ``sre`` code of each
+pattern, which is used instead of the pattern when the interpreter is the
+one the table was built with. That code comes from private APIs of `re`
+and changes between Python versions, so the shipped table does not have
+it::
+
+    $ make table-code
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import zlib
+
+import pygments
+from pygments.lexer import bygroups
+from pygments.token import _TokenType, string_to_tokentype
+
+try:
+    import _sre
+except ImportError:  # not CPython
+    _sre = None
+
+TABLE_VERSION = 2
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+TABLE_PATH = os.path.join(HERE, "_table.json")
+SOURCE_PATH = os.path.join(HERE, "lexer.py")
+
+_BYGROUPS_CODE = bygroups().__code__
+
+
+def source_hash(path=SOURCE_PATH):
+    with open(path, "rb") as fh:
+        return "%08x" % zlib.crc32(fh.read())
+
+
+def sre_tag():
+    """Identify the ``sre`` code format, ``None`` if it is not available."""
+    if _sre is None:
+        return None
+    return "%s-%d" % (sys.implementation.cache_tag, _sre.MAGIC)
+
+
+def _dump_code(pattern, flags):
+    try:
+        from re import _compiler, _parser
+    except ImportError:  # Python < 3.11
+        import sre_compile as _compiler
+        import sre_parse as _parser
+    compiled = re.compile(pattern, flags)
+    code = _compiler._code(_parser.parse(pattern, flags), flags)
+    return [compiled.flags, list(code), compiled.groups, dict(compiled.groupindex)]
+
+
+def _load_code(pattern, code):
+    flags, code, groups, groupindex = code
+    indexgroup = [None] * (groups + 1)
+    for name, index in groupindex.items():
+        indexgroup[index] = name
+    return _sre.compile(pattern, flags, code, groups, groupindex, tuple(indexgroup))
+
+
+def _closure(func):
+    cells = (cell.cell_contents for cell in func.__closure__)
+    return dict(zip(func.__code__.co_freevars, cells))
+
+
+def _dump_tokentype(ttype):
+    return ".".join(ttype)
+
+
+def _dump_group(group):
+    if group is not None and type(group) is not _TokenType:
+        raise ValueError("cannot serialise bygroups callback %r" % group)
+    return None if group is None else _dump_tokentype(group)
+
+
+def _dump_action(action):
+    if action is None or type(action) is _TokenType:
+        return None if action is None else _dump_tokentype(action)
+    if getattr(action, "__code__", None) is _BYGROUPS_CODE:
+        groups = [_dump_group(group) for group in _closure(action)["args"]]
+        return {"bygroups": groups}
+    if hasattr(action, "tag_groups"):
+        return {"tag_groups": [_dump_group(group) for group in action.tag_groups]}
+    if hasattr(action, "alias"):
+        return {"using_lexer": action.alias}
+    raise ValueError("cannot serialise action %r" % action)
+
+
+def _dump_new_state(new_state):
+    if isinstance(new_state, tuple):
+        return list(new_state)
+    return new_state
+
+
+def process(cls):
+    """Process the token definitions of ``cls`` as `RegexLexerMeta` does."""
+    cls._all_tokens = {}
+    cls._tmpname = 0
+    return cls.process_tokendef("", cls.get_tokendefs())
+
+
+def build(cls, code=False):
+    """
+    Return the table of lexer class ``cls`` as a JSON-compatible dict, with
+    the ``sre`` code of the patterns if ``code`` is true.
+    """
+    # states share rules through `include`, so each regex is stored once
+    patterns, indices = [], {}
+    states = {}
+    for name, rules in process(cls).items():
+        states[name] = []
+        for rexmatch, action, new_state in rules:
+            key = (rexmatch.__self__.pattern, rexmatch.__self__.flags)
+            if key not in indices:
+                indices[key] = len(patterns)
+                patterns.append(list(key))
+            states[name].append(
+                [indices[key], _dump_action(action), _dump_new_state(new_state)]
+            )
+    table = {
+        "version": TABLE_VERSION,
+        "pygments": pygments.__version__,
+        "source": source_hash(),
+        "patterns": patterns,
+        "states": states,
+    }
+    if code and sre_tag() is not None:
+        table["sre"] = sre_tag()
+        table["code"] = [_dump_code(pattern, flags) for pattern, flags in patterns]
+    return table
+
+
+def save(table, path=TABLE_PATH):
+    with open(path, "w") as fh:
+        json.dump(table, fh, separators=(",", ":"), sort_keys=True)
+        fh.write("\n")
+
+
+def _load_groups(groups):
+    return [None if group is None else string_to_tokentype(group) for group in groups]
+
+
+class LazyTokens(dict):
+    """
+    Processed token definitions, as ``RegexLexer._tokens``, compiling the
+    rules of a state from the table the first time it is looked up.
+    """
+
+    def __init__(self, patterns, states, using_lexer, code=None, tag_groups=bygroups):
+        super(LazyTokens, self).__init__()
+        self.patterns = patterns
+        self.states = states
+        self.using_lexer = using_lexer
+        self.tag_groups = tag_groups
+        self.code = code
+        self.compiled = {}
+
+    def compile(self, index):
+        """Return the ``match`` method of pattern ``index``."""
+        rexmatch = self.compiled.get(index)
+        if rexmatch is None:
+            pattern, flags = self.patterns[index]
+            if self.code is not None:
+                rexmatch = _load_code(pattern, self.code[index]).match
+            else:
+                rexmatch = re.compile(pattern, flags).match
+            self.compiled[index] = rexmatch
+        return rexmatch
+
+    def __missing__(self, name):
+        rules = []
+        for index, action, new_state in self.states[name]:
+            if isinstance(action, str):
+                action = string_to_tokentype(action)
+            elif action is not None:
+                if "bygroups" in action:
+                    action = bygroups(*_load_groups(action["bygroups"]))
+                elif "tag_groups" in action:
+                    action = self.tag_groups(*_load_groups(action["tag_groups"]))
+                else:
+                    action = self.using_lexer(action["using_lexer"])
+            if isinstance(new_state, list):
+                new_state = tuple(new_state)
+            rules.append((self.compile(index), action, new_state))
+        self[name] = rules
+        return rules
+
+
+def load(using_lexer, path=TABLE_PATH, tag_groups=bygroups):
+    """
+    Return `LazyTokens` for the table at ``path``, or ``None`` when there is
+    none or it was not built from the current Pygments and ``vue/lexer.py``.
+    ``using_lexer`` and ``tag_groups`` rebuild the actions of the same name.
+    """
+    try:
+        with open(path, "r") as fh:
+            table = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    built = (table.get("version"), table.get("pygments"), table.get("source"))
+    if built != (TABLE_VERSION, pygments.__version__, source_hash()):
+        return None
+    code = table.get("code") if table.get("sre") == sre_tag() else None
+    return LazyTokens(table["patterns"], table["states"], using_lexer, code, tag_groups)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="vue.table", description="Write %s." % os.path.relpath(TABLE_PATH)
+    )
+    parser.add_argument(
+        "--code",
+        action="store_true",
+        help="also store the compiled sre code, for this interpreter only",
+    )
+    args = parser.parse_args(argv)
+
+    from vue.lexer import VueLexer
+
+    save(build(VueLexer, code=args.code))
+    print("wrote %s" % os.path.relpath(TABLE_PATH))